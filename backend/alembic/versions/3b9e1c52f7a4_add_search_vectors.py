@@ -0,0 +1,45 @@
+"""add full-text search vectors to tasks and boards
+
+Revision ID: 3b9e1c52f7a4
+Revises: 75df28a7db00
+Create Date: 2026-10-18 11:40:06.524913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1c52f7a4'
+down_revision: Union[str, Sequence[str], None] = '75df28a7db00'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# title weighs more than description when ranking (ts_rank_cd)
+SEARCH_VECTORS = {
+    'tasks': "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+             "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+    'boards': "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+              "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # stored generated columns stay current on every INSERT/UPDATE without triggers
+    for table, expression in SEARCH_VECTORS.items():
+        op.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({expression}) STORED")
+    with op.get_context().autocommit_block():
+        for table in SEARCH_VECTORS:
+            op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin',
+                            postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SEARCH_VECTORS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table, if_exists=True)
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,56 @@
+"""store task status and priority as smallint codes
+
+Revision ID: 5d8a0f3e6b12
+Revises: c41e7b9a2d55
+Create Date: 2026-10-18 15:48:03.914520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8a0f3e6b12'
+down_revision: Union[str, Sequence[str], None] = 'c41e7b9a2d55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# free-form labels seen so far -> codes (see app/enums.py); anything else
+# falls back to the column default
+STATUS_CODES = "CASE WHEN lower(trim(status)) IN ('in progress', 'in-progress', 'in_progress', 'doing') THEN 1 " \
+               "WHEN lower(trim(status)) IN ('done', 'completed', 'complete', 'closed') THEN 2 ELSE 0 END"
+PRIORITY_CODES = "CASE lower(trim(priority)) WHEN 'low' THEN 0 WHEN 'high' THEN 2 ELSE 1 END"
+
+STATUS_LABELS = "CASE status WHEN 1 THEN 'In Progress' WHEN 2 THEN 'Done' ELSE 'To Do' END"
+PRIORITY_LABELS = "CASE priority WHEN 0 THEN 'Low' WHEN 2 THEN 'High' ELSE 'Medium' END"
+
+INDEXES = [
+    ('ix_tasks_board_id_priority_due_date', ['board_id', sa.text('priority DESC'), 'due_date'], {}),
+    ('ix_tasks_board_id_open_due_date', ['board_id', 'due_date'], {'postgresql_where': sa.text('status <> 2')}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rewrites the table (ACCESS EXCLUSIVE) - run in a quiet window
+    op.alter_column('tasks', 'status', type_=sa.SmallInteger(), server_default=sa.text('0'),
+                    postgresql_using=STATUS_CODES)
+    op.alter_column('tasks', 'priority', type_=sa.SmallInteger(), server_default=sa.text('1'),
+                    postgresql_using=PRIORITY_CODES)
+
+    with op.get_context().autocommit_block():
+        for name, columns, options in INDEXES:
+            op.create_index(name, 'tasks', columns, unique=False, postgresql_concurrently=True, if_not_exists=True, **options)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns, options in reversed(INDEXES):
+            op.drop_index(name, table_name='tasks', postgresql_concurrently=True, if_exists=True)
+
+    op.alter_column('tasks', 'priority', type_=sa.String(), server_default=None, postgresql_using=PRIORITY_LABELS)
+    op.alter_column('tasks', 'status', type_=sa.String(), server_default=None, postgresql_using=STATUS_LABELS)
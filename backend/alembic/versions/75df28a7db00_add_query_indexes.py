@@ -0,0 +1,41 @@
+"""add indexes for board and task listings
+
+Revision ID: 75df28a7db00
+Revises: d0d5c2ae4be7
+Create Date: 2026-10-18 09:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '75df28a7db00'
+down_revision: Union[str, Sequence[str], None] = 'd0d5c2ae4be7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_boards_owner_id_created_at', 'boards', ['owner_id', 'created_at', 'id']),
+    ('ix_tasks_board_id_created_at', 'tasks', ['board_id', 'created_at', 'id']),
+    ('ix_tasks_board_id_status_priority_due_date', 'tasks', ['board_id', 'status', 'priority', 'due_date']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps
+    # the tables writable while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,31 @@
+"""add version and updated_at to boards
+
+Revision ID: 8f2d4a61c0b9
+Revises: 3b9e1c52f7a4
+Create Date: 2026-10-18 13:05:41.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d4a61c0b9'
+down_revision: Union[str, Sequence[str], None] = '3b9e1c52f7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # constant defaults: no table rewrite on Postgres 11+
+    op.add_column('boards', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    op.add_column('boards', sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('boards', 'updated_at')
+    op.drop_column('boards', 'version')
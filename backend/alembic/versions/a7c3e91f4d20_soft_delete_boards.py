@@ -0,0 +1,39 @@
+"""soft-delete boards
+
+Revision ID: a7c3e91f4d20
+Revises: 5d8a0f3e6b12
+Create Date: 2026-10-18 17:12:40.281936
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91f4d20'
+down_revision: Union[str, Sequence[str], None] = '5d8a0f3e6b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # nullable without a default: a catalog-only change
+    op.add_column('boards', sa.Column('deleted_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_boards_deleted_at', 'boards', ['deleted_at'], unique=False,
+                        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_boards_deleted_at', table_name='boards', postgresql_concurrently=True, if_exists=True)
+
+    # boards still waiting for their purge would come back to life
+    op.execute('DELETE FROM boards WHERE deleted_at IS NOT NULL')
+    op.drop_column('boards', 'deleted_at')
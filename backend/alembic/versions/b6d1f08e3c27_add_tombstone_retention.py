@@ -0,0 +1,35 @@
+"""add tombstone retention
+
+Revision ID: b6d1f08e3c27
+Revises: f5a17d3c8e42
+Create Date: 2026-10-18 22:41:05.264183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1f08e3c27'
+down_revision: Union[str, Sequence[str], None] = 'f5a17d3c8e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('tombstones_purged_seq', sa.BigInteger(), server_default=sa.text('0'), nullable=False))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tombstones_deleted_at', table_name='tombstones', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('users', 'tombstones_purged_seq')
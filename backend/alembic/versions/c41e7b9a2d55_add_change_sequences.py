@@ -0,0 +1,60 @@
+"""add change sequences and tombstones for incremental sync
+
+Revision ID: c41e7b9a2d55
+Revises: 8f2d4a61c0b9
+Create Date: 2026-10-18 14:22:17.560931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7b9a2d55'
+down_revision: Union[str, Sequence[str], None] = '8f2d4a61c0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_boards_owner_id_change_seq', 'boards', ['owner_id', 'change_seq']),
+    ('ix_tasks_board_id_change_seq', 'tasks', ['board_id', 'change_seq']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing rows get sequence 0, so a first sync (since=0) returns everything
+    for table in ('users', 'boards', 'tasks'):
+        op.add_column(table, sa.Column('change_seq', sa.BigInteger(), server_default=sa.text('0'), nullable=False))
+
+    op.create_table('tombstones',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('board_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tombstones_owner_id_change_seq', 'tombstones', ['owner_id', 'change_seq'], unique=False)
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.drop_index('ix_tombstones_owner_id_change_seq', table_name='tombstones')
+    op.drop_table('tombstones')
+    for table in ('tasks', 'boards', 'users'):
+        op.drop_column(table, 'change_seq')
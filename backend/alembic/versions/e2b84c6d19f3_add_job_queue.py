@@ -0,0 +1,62 @@
+"""add job queue
+
+Revision ID: e2b84c6d19f3
+Revises: a7c3e91f4d20
+Create Date: 2026-10-18 19:04:12.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b84c6d19f3'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e91f4d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# TaskStatus.done
+DONE = 2
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('key', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), server_default=sa.text("'queued'"), nullable=False),
+    sa.Column('run_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_index('ix_jobs_run_at', 'jobs', ['run_at'], unique=False,
+                    postgresql_where=sa.text("status <> 'failed'"))
+
+    # boards deleted so far were purged by an in-process thread; queue them
+    op.execute(
+        "INSERT INTO jobs (kind, payload, key, max_attempts) "
+        "SELECT 'purge_board', json_build_object('board_id', id), 'purge_board:' || id, 5 "
+        "FROM boards WHERE deleted_at IS NOT NULL"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_open_due_date', 'tasks', ['due_date', 'id'], unique=False,
+                        postgresql_where=sa.text(f'status <> {DONE}'),
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_open_due_date', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_index('ix_jobs_run_at', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,66 @@
+"""add user stats
+
+Revision ID: f5a17d3c8e42
+Revises: e2b84c6d19f3
+Create Date: 2026-10-18 21:26:47.093518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a17d3c8e42'
+down_revision: Union[str, Sequence[str], None] = 'e2b84c6d19f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# column -> filter, by TaskStatus / TaskPriority code
+COUNTERS = {
+    'status_todo': 't.status = 0',
+    'status_in_progress': 't.status = 1',
+    'status_done': 't.status = 2',
+    'priority_low': 't.priority = 0',
+    'priority_medium': 't.priority = 1',
+    'priority_high': 't.priority = 2',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    *[sa.Column(name, sa.Integer(), server_default=sa.text('0'), nullable=False) for name in COUNTERS],
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('user_stats_daily',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('completed', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # counters as of now, for every user (new users get theirs in create_user)
+    op.execute(
+        f"INSERT INTO user_stats (user_id, {', '.join(COUNTERS)}) "
+        f"SELECT u.id, {', '.join(f'count(t.id) FILTER (WHERE {where})' for where in COUNTERS.values())} "
+        "FROM users u LEFT JOIN boards b ON b.owner_id = u.id AND b.deleted_at IS NULL "
+        "LEFT JOIN tasks t ON t.board_id = b.id GROUP BY u.id"
+    )
+    # created per day from the tasks; when tasks were completed was never recorded
+    op.execute(
+        "INSERT INTO user_stats_daily (user_id, day, created) "
+        "SELECT b.owner_id, (t.created_at AT TIME ZONE 'UTC')::date, count(*) "
+        "FROM tasks t JOIN boards b ON b.id = t.board_id WHERE b.deleted_at IS NULL GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_stats_daily')
+    op.drop_table('user_stats')
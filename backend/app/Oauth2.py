@@ -1,18 +1,25 @@
 from jose import JWTError , jwt
 from datetime import datetime , timedelta , timezone
-from . import schemas, database, models
-from fastapi import Depends, status, HTTPException
+from . import schemas, database, models, crud, instrumentation
+from typing import Optional
+from fastapi import Depends, Query, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+from .cache import TTLCache
 from .config import settings
 
 Oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+Oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
 
 
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
+# user id -> schemas.user.Principal, so hot sessions skip the users lookup
+principal_cache = TTLCache(maxsize=settings.principal_cache_max_size, ttl=settings.principal_cache_ttl_seconds)
+
 def create_access_token(data : dict):
     to_encode= data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes = ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -21,6 +28,12 @@ def create_access_token(data : dict):
     return encoded_jwt
 
 
+def create_stream_token(user_id: int, board_id: int):
+    """Short-lived token that only opens the change feed of one board."""
+    expire = datetime.now(timezone.utc) + timedelta(seconds=settings.events_token_ttl_seconds)
+    return jwt.encode({"stream_user_id": user_id, "board_id": board_id, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
+
 def verify_access_token(token: str , credentials_exception):
     try:
         payload = jwt.decode(token ,SECRET_KEY , algorithms=[ALGORITHM])
@@ -34,9 +47,63 @@ def verify_access_token(token: str , credentials_exception):
     return token_data    
 
 
-def get_current_user(token:str = Depends(Oauth2_scheme), db:Session = Depends(database.get_db)):
-    credentials_exception = HTTPException(status_code = status.HTTP_401_UNAUTHORIZED , detail="Could not validate credentials" , headers={"WWW-Authenticate": "Bearer"})
-    token = verify_access_token(token , credentials_exception)
-    user = db.query(models.User).filter(models.User.id == token.id).first()
-    return user
+def invalidate_principal(user_id):
+    principal_cache.pop(int(user_id))
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_principal_on_change(mapper, connection, target):
+    invalidate_principal(target.id)
+
+
+def _credentials_exception():
+    return HTTPException(status_code = status.HTTP_401_UNAUTHORIZED , detail="Could not validate credentials" , headers={"WWW-Authenticate": "Bearer"})
+
+
+async def get_current_user(token:str = Depends(Oauth2_scheme), db:Session = Depends(database.get_db)):
+    credentials_exception = _credentials_exception()
+    with instrumentation.span("jwt"):
+        token = verify_access_token(token , credentials_exception)
+    return await _principal(int(token.id), db, credentials_exception)
+
+
+async def _principal(user_id: int, db: Session, credentials_exception):
+    if settings.trust_token_claims:
+        return schemas.user.Principal(id=user_id)
 
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await database.run_db(db, crud.get_user, user_id)
+    if not user:
+        raise credentials_exception
+    principal = schemas.user.Principal.model_validate(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+async def get_current_user_for_stream(board_id: int, token:Optional[str] = Depends(Oauth2_scheme_optional), stream_token:Optional[str] = Query(None, alias="token"), access_token:Optional[str] = Query(None), db:Session = Depends(database.get_db)):
+    """Like get_current_user, but EventSource cannot set headers: it passes a
+    stream token from POST /boards/{board_id}/events/token as ?token=.
+
+    Query strings end up in access logs, proxies and browser history, so the
+    token there is scoped to one board and expires after
+    EVENTS_TOKEN_TTL_SECONDS. Sending the long-lived access token as
+    ?access_token= instead is only accepted with EVENTS_QUERY_ACCESS_TOKEN.
+    """
+    if token or not stream_token:
+        if not token and settings.events_query_access_token:
+            token = access_token
+        return await get_current_user(token or "", db)
+
+    credentials_exception = _credentials_exception()
+    try:
+        payload = jwt.decode(stream_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    user_id = payload.get("stream_user_id")
+    if user_id is None or payload.get("board_id") != board_id:
+        raise credentials_exception
+    return await _principal(int(user_id), db, credentials_exception)
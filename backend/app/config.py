@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,6 +12,136 @@ class Settings(BaseSettings):
     algorithm: str
     access_token_expire_minutes: int
 
+    # bcrypt cost factor; existing hashes with another cost are rehashed on login
+    bcrypt_rounds: int = 12
+    # dedicated pool for password hashing: "thread" or "process"
+    password_executor: str = "thread"
+    password_workers: int = 4
+    # hashing jobs allowed to wait for a worker before requests get 429
+    password_queue_size: int = 32
+
+    # full SQLAlchemy URL, overrides the database_* parts above when set
+    database_url: Optional[str] = None
+    # serve requests through an AsyncSession (asyncpg / aiosqlite) instead of
+    # a sync Session in the threadpool
+    database_async: bool = False
+
+    # read replicas, comma-separated SQLAlchemy URLs: GET requests read from
+    # them unless the client wrote in the last REPLICA_STICKY_SECONDS or the
+    # replicas lag more than REPLICA_MAX_LAG_SECONDS (see app/replicas.py).
+    # Recent writers are remembered per process ("memory") or in REDIS_URL
+    # ("redis"), which multi-worker deployments want
+    database_replica_urls: str = ""
+    replica_sticky_seconds: float = 5
+    replica_sticky_backend: str = "memory"
+    replica_max_lag_seconds: float = 2
+    replica_check_interval_seconds: float = 1
+
+    # connection pool: "queue" keeps a pool per worker, "null" opens a
+    # connection per checkout and is the mode to use behind PgBouncer
+    db_pool_mode: str = "queue"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # abort statements running longer than this (0 disables)
+    db_statement_timeout_ms: int = 0
+
+    # principal cache used by Oauth2.get_current_user
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_max_size: int = 1024
+    # skip the users lookup entirely and build the principal from the JWT claims
+    trust_token_claims: bool = False
+
+    # "auto" uses Postgres full-text search on PostgreSQL and the in-process
+    # inverted index elsewhere; "postgres", "memory" or "like" force a backend
+    search_backend: str = "auto"
+    # boards (and board owners) whose in-process "memory" index is kept
+    search_cache_max_size: int = 1000
+    search_cache_ttl_seconds: int = 600
+
+    # GET responses for boards/tasks always carry an ETag; "memory" or "redis"
+    # additionally keep serialized bodies keyed by that ETag ("off" disables)
+    response_cache_backend: str = "off"
+    response_cache_ttl_seconds: int = 300
+    response_cache_max_entries: int = 10000
+    redis_url: Optional[str] = None
+
+    # board change feed (GET /boards/{board_id}/events): "local" fans out in
+    # process, "postgres" uses LISTEN/NOTIFY so every worker sees every write
+    events_backend: str = "local"
+    # events kept per board for Last-Event-ID resume
+    events_replay_size: int = 256
+    # bigger writes are announced as "board.changed" without the tasks
+    events_max_tasks: int = 100
+    events_keepalive_seconds: float = 15
+    # EventSource cannot send headers: browsers open the feed with a stream
+    # token from POST /boards/{board_id}/events/token, valid this long. The
+    # long-lived access token as ?access_token= leaks into logs and history
+    # and is refused unless EVENTS_QUERY_ACCESS_TOKEN is set
+    events_token_ttl_seconds: int = 60
+    events_query_access_token: bool = False
+
+    # sampling profiler (see app/instrumentation.py): fraction of requests to
+    # profile, and whether clients may ask for it with an "X-Profile: 1" header
+    profile_sample_rate: float = 0.0
+    profile_header: bool = False
+    profile_interval_ms: float = 5
+    # keep profiles of requests at least this slow (header-triggered: always)
+    profile_slow_ms: float = 500
+    profile_store_size: int = 50
+
+    # orjson responses, and board/task lists read as plain rows and encoded
+    # without re-validation (see app/serialization.py); needs orjson
+    fast_json: bool = False
+
+    # job queue (see app/jobs.py): worker threads the API process runs itself
+    # (0 leaves every job to `python -m app.worker`), and that command's default
+    job_inline_workers: int = 1
+    job_worker_concurrency: int = 4
+    job_poll_seconds: float = 1
+    # a claimed job is claimed again if its worker goes silent this long
+    job_lease_seconds: float = 300
+    job_max_attempts: int = 5
+    # retry delay: doubles from JOB_BACKOFF_SECONDS up to the max, with jitter
+    job_backoff_seconds: float = 10
+    job_backoff_max_seconds: float = 3600
+
+    # due-date reminders (see app/reminders.py): open tasks are announced as
+    # "task.due" board events when they come within the lead time of their
+    # due date (interval 0 disables)
+    due_reminder_interval_seconds: float = 60
+    due_reminder_lead_minutes: float = 0
+    due_reminder_batch_size: int = 1000
+
+    # deletions GET /sync reports are kept this long; older sync tokens are
+    # answered with "reset" (app/tombstones.py). 0 keeps them forever
+    tombstone_retention_days: float = 30
+    tombstone_purge_interval_seconds: float = 3600
+
+    # deleted boards lose their tasks in chunks of this many rows, one short
+    # transaction each, pausing in between to leave room for live traffic
+    purge_chunk_size: int = 1000
+    purge_pause_ms: float = 10
+
+    # token-bucket rate limits (see app/ratelimit.py): "memory" keeps buckets
+    # per process, "redis" shares them through REDIS_URL ("off" disables).
+    # Rules are "METHOD PATH ip|user N/SECONDS", comma-separated
+    rate_limit_backend: str = "off"
+    rate_limit_rules: str = (
+        "POST /login ip 10/60, POST /users/ ip 5/60, "
+        "GET /boards/{board_id}/tasks/ user 20/1, * * user 600/60, * * ip 1200/60"
+    )
+
+    # identical authenticated GETs in flight at the same time share one
+    # response (see app/singleflight.py); larger bodies are not shared
+    coalesce_gets: bool = False
+    coalesce_max_body_bytes: int = 1048576
+
+    # largest body accepted by POST /boards/{board_id}/tasks:batch
+    task_batch_max_items: int = 5000
+
     class Config:
         env_file = ".env"
 
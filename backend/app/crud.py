@@ -0,0 +1,689 @@
+"""Data-access helpers shared by the routers.
+
+Ownership is folded into the statements themselves (``WHERE board.owner_id =
+:user_id``) so the happy path is a single round trip. When a scoped statement
+matches nothing, `raise_access_error` runs one extra query to tell a missing
+board (404) apart from someone else's board (403) and a missing task (404).
+"""
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import and_, case, delete, func, insert, literal, not_, select, union_all, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import events, httpcache, models, pagination, purge, search as search_backends, serialization, stats
+from .enums import TaskStatus
+from .schemas import board as board_schemas, task as task_schemas
+
+
+# ?sort= fields; priority sorts most urgent first, due dates soonest first,
+# and a leading "-" reverses either
+TASK_SORTS = {
+    "priority": models.Task.priority.desc(),
+    "due_date": models.Task.due_date.asc().nulls_last(),
+    "created_at": models.Task.created_at.asc(),
+    "status": models.Task.status.asc(),
+    "title": models.Task.title.asc(),
+}
+TASK_SORTS_REVERSED = {
+    "priority": models.Task.priority.asc(),
+    "due_date": models.Task.due_date.desc().nulls_last(),
+    "created_at": models.Task.created_at.desc(),
+    "status": models.Task.status.desc(),
+    "title": models.Task.title.desc(),
+}
+
+# deleted boards stay in the table until app/purge.py gets to them
+LIVE_BOARD = models.Board.deleted_at.is_(None)
+
+
+def board_not_found(board_id: int):
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Board with id {board_id} not found"
+    )
+
+
+def not_authorized():
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to perform this action"
+    )
+
+
+def task_not_found(task_id: int, board_id: int):
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Task with id {task_id} not found in board {board_id}"
+    )
+
+
+def owned_board_ids(board_id: int, user_id: int):
+    """Subquery yielding `board_id` only when it belongs to `user_id`."""
+    return select(models.Board.id).where(
+        models.Board.id == board_id,
+        models.Board.owner_id == user_id,
+        LIVE_BOARD
+    )
+
+
+def raise_access_error(db: Session, board_id: int, user_id: int, task_id: int = None):
+    """Raise the right 404/403 after a scoped statement matched no rows."""
+    row = db.execute(
+        select(models.Board.owner_id, models.Task.id)
+        .select_from(models.Board)
+        .outerjoin(models.Task, and_(models.Task.board_id == models.Board.id, models.Task.id == task_id))
+        .where(models.Board.id == board_id, LIVE_BOARD)
+    ).first()
+    if row is None:
+        raise board_not_found(board_id)
+    if row.owner_id != int(user_id):
+        raise not_authorized()
+    if task_id is not None:
+        raise task_not_found(task_id, board_id)
+
+
+def check_board_access(db: Session, board_id: int, user_id: int):
+    """Raise 404/403 unless the board exists and belongs to `user_id`."""
+    owner_id = db.execute(
+        select(models.Board.owner_id).where(models.Board.id == board_id, LIVE_BOARD)
+    ).scalar()
+    if owner_id is None:
+        raise board_not_found(board_id)
+    if owner_id != int(user_id):
+        raise not_authorized()
+
+
+def touch_board(db: Session, board_id: int):
+    """Bump the board's version in the current transaction and return the new one."""
+    return db.scalars(
+        update(models.Board)
+        .where(models.Board.id == board_id)
+        .values(version=models.Board.version + 1, updated_at=models.db_now())
+        .returning(models.Board.version)
+        .execution_options(synchronize_session=False)
+    ).first()
+
+
+def next_change_seq(db: Session, user_id: int):
+    """Take `user_id`'s next change sequence number for the current transaction.
+
+    The UPDATE locks the user's row until commit, so concurrent writers of
+    the same user commit in sequence order and GET /sync never skips one.
+    """
+    return db.scalars(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(change_seq=models.User.change_seq + 1)
+        .returning(models.User.change_seq)
+        .execution_options(synchronize_session=False)
+    ).one()
+
+
+def record_deletes(db: Session, user_id: int, entity: str, ids, board_id: int, change_seq: int):
+    if ids:
+        db.execute(insert(models.Tombstone), [
+            {"owner_id": user_id, "entity": entity, "entity_id": id, "board_id": board_id, "change_seq": change_seq}
+            for id in ids
+        ])
+
+
+def board_changed(board_id: int, owner_id: int = None, boards_changed: bool = False):
+    """Drop derived state (search indexes, cached responses) after a commit."""
+    search_backends.invalidate_board(board_id)
+    if boards_changed:
+        search_backends.invalidate_owner(owner_id)
+    httpcache.invalidate(board_id, owner_id)
+
+
+def board_version(db: Session, board_id: int, user_id: int):
+    """(version, last modified) of one board, raising 404/403 like the reads do."""
+    row = db.execute(
+        select(models.Board.owner_id, models.Board.version, models.Board.updated_at)
+        .where(models.Board.id == board_id, LIVE_BOARD)
+    ).first()
+    if row is None:
+        raise board_not_found(board_id)
+    if row.owner_id != int(user_id):
+        raise not_authorized()
+    return row.version, row.updated_at
+
+
+def boards_version(db: Session, user_id: int):
+    """One tag for all boards of `user_id`: changes with any write, create or delete."""
+    row = db.execute(
+        select(
+            func.count(models.Board.id).label("count"),
+            func.coalesce(func.sum(models.Board.version), 0).label("versions"),
+            func.coalesce(func.max(models.Board.id), 0).label("max_id"),
+            func.max(models.Board.updated_at).label("updated_at"),
+        ).where(models.Board.owner_id == user_id, LIVE_BOARD)
+    ).one()
+    stamp = row.updated_at.timestamp() if hasattr(row.updated_at, "timestamp") else row.updated_at
+    return f"u{user_id}n{row.count}v{row.versions}m{row.max_id}t{stamp}", row.updated_at
+
+
+def is_overdue(now: datetime = None):
+    return and_(models.Task.due_date < (now or datetime.now()), models.Task.status != TaskStatus.done)
+
+
+def task_filters(status=None, priority=None, due_before=None, due_after=None, overdue=None):
+    """WHERE criteria for the task list filters; `status`/`priority` are lists of members."""
+    criteria = []
+    if status:
+        criteria.append(models.Task.status.in_(status))
+    if priority:
+        criteria.append(models.Task.priority.in_(priority))
+    if due_before is not None:
+        criteria.append(models.Task.due_date < due_before)
+    if due_after is not None:
+        criteria.append(models.Task.due_date >= due_after)
+    if overdue is not None:
+        criteria.append(is_overdue() if overdue else not_(func.coalesce(is_overdue(), False)))
+    return criteria
+
+
+def task_order(sort: str = None):
+    """ORDER BY for ?sort=priority,-due_date; newest first when not given."""
+    if not sort:
+        return [models.Task.created_at.desc(), models.Task.id.desc()]
+    order = []
+    for field in sort.split(","):
+        field = field.strip()
+        sorts = TASK_SORTS_REVERSED if field.startswith("-") else TASK_SORTS
+        if field.lstrip("-") not in sorts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot sort by {field!r}; use {', '.join(TASK_SORTS)}"
+            )
+        order.append(sorts[field.lstrip("-")])
+    return order + [models.Task.id]
+
+
+def parse_due_date(values: dict):
+    # Handle date format from frontend (YYYY-MM-DD)
+    if isinstance(values.get('due_date'), str):
+        try:
+            values['due_date'] = datetime.strptime(values['due_date'], '%Y-%m-%d')
+        except ValueError:
+            values['due_date'] = None
+    return values
+
+
+def create_task(db: Session, board_id: int, user_id: int, values: dict):
+    """INSERT ... SELECT from the owned board, so nothing is written for a foreign board."""
+    values = parse_due_date(dict(values))
+    values["change_seq"] = next_change_seq(db, user_id)
+    columns = list(values)
+    source = select(
+        *[literal(values[name], type_=models.Task.__table__.c[name].type) for name in columns],
+        models.Board.id
+    ).where(models.Board.id == board_id, models.Board.owner_id == user_id, LIVE_BOARD)
+
+    stmt = (
+        insert(models.Task)
+        .from_select(columns + ['board_id'], source)
+        .returning(models.Task)
+    )
+    new_task = db.scalars(stmt).first()
+    if new_task is None:
+        db.rollback()
+        raise_access_error(db, board_id, user_id)
+    stats.record(db, user_id, created=[new_task])
+    events.emit(db, board_id, touch_board(db, board_id), "task.created", tasks=[new_task])
+    db.commit()
+    board_changed(board_id, user_id)
+    return new_task
+
+
+def task_query(db: Session, board_id: int, user_id: int, search: str = "", filters: dict = None, columns=None):
+    query = (
+        select(*(columns or (models.Task,)))
+        .join(models.Board, models.Board.id == models.Task.board_id)
+        .where(models.Task.board_id == board_id, models.Board.owner_id == user_id, LIVE_BOARD)
+        .where(*task_filters(**(filters or {})))
+    )
+    if search:
+        query = search_backends.get_backend(db).filter_tasks(db, query, board_id, search)
+    return query
+
+
+def list_tasks(db: Session, board_id: int, user_id: int, limit: int = 100, skip: int = 0, search: str = "", filters: dict = None, sort: str = None, project: bool = False):
+    """Tasks of a board; `project` returns TaskOut-shaped dicts instead of ORM objects."""
+    columns = serialization.columns(models.Task, task_schemas.TaskOut) if project else None
+    query = task_query(db, board_id, user_id, search, filters, columns)
+    query = query.order_by(*task_order(sort)).limit(limit).offset(skip)
+
+    tasks = serialization.as_dicts(db.execute(query)) if project else db.scalars(query).all()
+    if not tasks:
+        # an empty page is ambiguous: empty board, foreign board or no board at all
+        check_board_access(db, board_id, user_id)
+    return tasks
+
+
+def page_tasks(db: Session, board_id: int, user_id: int, cursor: str = None, limit: int = 100, search: str = "", include_total: bool = False, filters: dict = None, project: bool = False):
+    columns = serialization.columns(models.Task, task_schemas.TaskOut) if project else None
+    query = task_query(db, board_id, user_id, search, filters, columns)
+    tasks, next_cursor = pagination.paginate(db, query, models.Task, cursor=cursor, limit=limit, as_rows=project)
+    if not tasks:
+        check_board_access(db, board_id, user_id)
+    if project:
+        tasks = serialization.as_dicts(tasks)
+    total = pagination.estimate_count(db, query) if include_total else None
+    return {"tasks": tasks, "next_cursor": next_cursor, "total": total}
+
+
+def search_tasks(db: Session, board_id: int, user_id: int, text: str, limit: int = 20):
+    """Ranked matches with highlighted snippets, best match first."""
+    query = task_query(db, board_id, user_id)
+    hits = search_backends.get_backend(db).search_tasks(db, query, board_id, text, limit)
+    if not hits:
+        check_board_access(db, board_id, user_id)
+    return [
+        {**{column.name: getattr(task, column.name) for column in models.Task.__table__.columns},
+         "rank": rank, "highlight": highlight}
+        for task, rank, highlight in hits
+    ]
+
+
+def get_task(db: Session, board_id: int, task_id: int, user_id: int):
+    row = db.execute(
+        select(models.Board.owner_id, models.Task)
+        .select_from(models.Board)
+        .outerjoin(models.Task, and_(models.Task.board_id == models.Board.id, models.Task.id == task_id))
+        .where(models.Board.id == board_id, LIVE_BOARD)
+    ).first()
+    if row is None:
+        raise board_not_found(board_id)
+    if row.owner_id != int(user_id):
+        raise not_authorized()
+    if row.Task is None:
+        raise task_not_found(task_id, board_id)
+    return row.Task
+
+
+def update_task(db: Session, board_id: int, task_id: int, user_id: int, values: dict):
+    values = parse_due_date(dict(values))
+    if not values:
+        return get_task(db, board_id, task_id, user_id)
+    values["change_seq"] = next_change_seq(db, user_id)
+    scope = (models.Task.id == task_id, models.Task.board_id.in_(owned_board_ids(board_id, user_id)))
+    # read under the user's lock taken above, so nothing changes it before the UPDATE
+    old = db.execute(
+        select(models.Task.status, models.Task.priority).where(*scope)
+    ).first() if values.keys() & stats.FIELDS else None
+
+    stmt = (
+        update(models.Task)
+        .where(*scope)
+        .values(**values)
+        .returning(models.Task)
+        # tasks already in the session take the values RETURNING has
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    task_obj = db.scalars(stmt).first()
+    if task_obj is None:
+        db.rollback()
+        raise_access_error(db, board_id, user_id, task_id)
+    if old is not None:
+        stats.record(db, user_id, updated=[(old, task_obj)])
+    events.emit(db, board_id, touch_board(db, board_id), "task.updated", tasks=[task_obj])
+    db.commit()
+    board_changed(board_id, user_id)
+    return task_obj
+
+
+def delete_task(db: Session, board_id: int, task_id: int, user_id: int):
+    change_seq = next_change_seq(db, user_id)
+    stmt = (
+        delete(models.Task)
+        .where(
+            models.Task.id == task_id,
+            models.Task.board_id.in_(owned_board_ids(board_id, user_id))
+        )
+        .returning(models.Task.id, models.Task.status, models.Task.priority, models.Task.due_date)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = db.execute(stmt).first()
+    if deleted is None:
+        db.rollback()
+        raise_access_error(db, board_id, user_id, task_id)
+    record_deletes(db, user_id, "task", [deleted.id], board_id, change_seq)
+    stats.record(db, user_id, deleted=[deleted])
+    events.emit(db, board_id, touch_board(db, board_id), "task.deleted", ids=[deleted.id])
+    db.commit()
+    board_changed(board_id, user_id)
+
+
+def batch_create_tasks(db: Session, board_id: int, user_id: int, items: list):
+    """Validate each item on its own, then insert all valid ones in one transaction."""
+    check_board_access(db, board_id, user_id)
+
+    rows, indexes, errors = [], [], []
+    for index, item in enumerate(items):
+        try:
+            values = task_schemas.TaskCreate.model_validate(item).model_dump()
+        except ValidationError as exc:
+            errors.append({"index": index, "errors": exc.errors(include_url=False, include_context=False)})
+            continue
+        rows.append({**parse_due_date(values), "board_id": board_id})
+        indexes.append(index)
+
+    created = []
+    if rows:
+        change_seq = next_change_seq(db, user_id)
+        for row in rows:
+            row["change_seq"] = change_seq
+        # executemany with RETURNING (batched "insertmanyvalues" on Postgres)
+        created = db.scalars(insert(models.Task).returning(models.Task, sort_by_parameter_order=True), rows).all()
+        stats.record(db, user_id, created=created)
+        events.emit(db, board_id, touch_board(db, board_id), "task.created", tasks=created)
+        db.commit()
+        board_changed(board_id, user_id)
+    return {"created": [{"index": index, "task": task} for index, task in zip(indexes, created)], "errors": errors}
+
+
+def _batch_filter(board_id: int, ids=None, status=None, priority=None):
+    criteria = [models.Task.board_id == board_id]
+    if ids is not None:
+        criteria.append(models.Task.id.in_(ids))
+    if status is not None:
+        criteria.append(models.Task.status == status)
+    if priority is not None:
+        criteria.append(models.Task.priority == priority)
+    return criteria
+
+
+def batch_update_tasks(db: Session, board_id: int, user_id: int, ids=None, where_status=None, where_priority=None, values=None):
+    check_board_access(db, board_id, user_id)
+    change_seq = next_change_seq(db, user_id)
+    criteria = _batch_filter(board_id, ids, where_status, where_priority)
+    old = {
+        row.id: row for row in db.execute(
+            select(models.Task.id, models.Task.status, models.Task.priority).where(*criteria)
+        )
+    } if values.keys() & stats.FIELDS else None
+    updated = db.scalars(
+        update(models.Task)
+        .where(*criteria)
+        .values(**values, change_seq=change_seq)
+        .returning(models.Task)
+        # tasks already in the session take the values RETURNING has
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).all()
+    if updated and old is not None:
+        stats.record(db, user_id, updated=[(old[task.id], task) for task in updated])
+    if updated:
+        events.emit(db, board_id, touch_board(db, board_id), "task.updated", tasks=updated)
+    db.commit()
+    board_changed(board_id, user_id)
+    found = {task.id for task in updated}
+    return {"updated": updated, "missing_ids": [id for id in ids or [] if id not in found]}
+
+
+def batch_delete_tasks(db: Session, board_id: int, user_id: int, ids=None, status=None, priority=None):
+    check_board_access(db, board_id, user_id)
+    deleted = db.execute(
+        delete(models.Task)
+        .where(*_batch_filter(board_id, ids, status, priority))
+        .returning(models.Task.id, models.Task.status, models.Task.priority, models.Task.due_date)
+        .execution_options(synchronize_session=False)
+    ).all()
+    deleted_ids = [row.id for row in deleted]
+    if deleted_ids:
+        record_deletes(db, user_id, "task", deleted_ids, board_id, next_change_seq(db, user_id))
+        # RETURNING has the rows as deleted, whatever ran concurrently
+        stats.record(db, user_id, deleted=deleted)
+        events.emit(db, board_id, touch_board(db, board_id), "task.deleted", ids=deleted_ids)
+    db.commit()
+    board_changed(board_id, user_id)
+    found = set(deleted_ids)
+    return {"deleted_ids": deleted_ids, "missing_ids": [id for id in ids or [] if id not in found]}
+
+
+def board_summaries(db: Session, user_id: int, limit: int = 10, skip: int = 0, search: str = ""):
+    """Boards of `user_id` with task counts by status/priority, in one GROUP BY query."""
+    boards = (
+        board_query(db, user_id, search)
+        .order_by(models.Board.id)
+        .limit(limit)
+        .offset(skip)
+        .subquery()
+    )
+    overdue = case((is_overdue(), 1), else_=0)
+    rows = db.execute(
+        select(
+            boards,
+            models.Task.status,
+            models.Task.priority,
+            func.count(models.Task.id).label("task_count"),
+            func.coalesce(func.sum(overdue), 0).label("overdue_count"),
+        )
+        .select_from(boards)
+        .outerjoin(models.Task, models.Task.board_id == boards.c.id)
+        .group_by(*boards.c, models.Task.status, models.Task.priority)
+        .order_by(boards.c.id)
+    ).all()
+
+    summaries = {}
+    for row in rows:
+        summary = summaries.get(row.id)
+        if summary is None:
+            summary = summaries[row.id] = {
+                "title": row.title,
+                "description": row.description,
+                "id": row.id,
+                "created_at": row.created_at,
+                "owner_id": row.owner_id,
+                "stats": {"total": 0, "completed": 0, "overdue": 0, "by_status": {}, "by_priority": {}},
+            }
+        if not row.task_count:
+            continue
+        stats = summary["stats"]
+        stats["total"] += row.task_count
+        stats["overdue"] += row.overdue_count
+        stats["by_status"][row.status.value] = stats["by_status"].get(row.status.value, 0) + row.task_count
+        stats["by_priority"][row.priority.value] = stats["by_priority"].get(row.priority.value, 0) + row.task_count
+        if row.status is TaskStatus.done:
+            stats["completed"] += row.task_count
+    return list(summaries.values())
+
+
+def create_board(db: Session, user_id: int, values: dict):
+    new_board = db.scalars(
+        insert(models.Board)
+        .values(**values, owner_id=user_id, change_seq=next_change_seq(db, user_id))
+        .returning(models.Board)
+    ).one()
+    db.commit()
+    # a new board has no tasks; don't let BoardOut lazy-load them
+    set_committed_value(new_board, "tasks", [])
+    search_backends.invalidate_owner(user_id)
+    httpcache.invalidate(owner_id=user_id)
+    return new_board
+
+
+def get_board(db: Session, board_id: int, user_id: int):
+    board = db.scalars(
+        select(models.Board)
+        .options(selectinload(models.Board.tasks))
+        .where(models.Board.id == board_id, LIVE_BOARD)
+    ).first()
+    if not board:
+        raise board_not_found(board_id)
+    if board.owner_id != int(user_id):
+        raise not_authorized()
+    return board
+
+
+def update_board(db: Session, board_id: int, user_id: int, values: dict):
+    board = db.scalars(
+        update(models.Board)
+        .where(models.Board.id == board_id, models.Board.owner_id == user_id, LIVE_BOARD)
+        .values(**values, version=models.Board.version + 1, updated_at=models.db_now(),
+                change_seq=next_change_seq(db, user_id))
+        .returning(models.Board)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if board is None:
+        db.rollback()
+        raise_access_error(db, board_id, user_id)
+    events.emit(db, board_id, board.version, "board.updated",
+                board={"id": board.id, "title": board.title, "description": board.description})
+    db.commit()
+    db.refresh(board, ["tasks"])
+    board_changed(board_id, user_id, boards_changed=True)
+    return board
+
+
+def delete_board(db: Session, board_id: int, user_id: int):
+    """Hide the board now (one UPDATE) and leave its tasks to a background purge."""
+    version = db.scalars(
+        update(models.Board)
+        .where(models.Board.id == board_id, models.Board.owner_id == user_id, LIVE_BOARD)
+        .values(deleted_at=models.db_now(), version=models.Board.version + 1, updated_at=models.db_now())
+        .returning(models.Board.version)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if version is None:
+        db.rollback()
+        raise_access_error(db, board_id, user_id)
+    # the board's tasks go with it; sync clients drop them on the board's tombstone
+    record_deletes(db, user_id, "board", [board_id], board_id, next_change_seq(db, user_id))
+    stats.apply(db, user_id, stats.board_changes(db, board_id))
+    events.emit(db, board_id, version, "board.deleted")
+    purge.schedule(db, board_id)
+    db.commit()
+    board_changed(board_id, user_id, boards_changed=True)
+
+
+def purge_status(db: Session, board_id: int, user_id: int):
+    """Progress of a deleted board's purge; 404 once it is gone (or was never deleted)."""
+    row = db.execute(
+        select(models.Board.owner_id, models.Board.deleted_at).where(models.Board.id == board_id)
+    ).first()
+    if row is None or row.deleted_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No purge pending for board {board_id}"
+        )
+    if row.owner_id != int(user_id):
+        raise not_authorized()
+    running = purge.progress.get(board_id)
+    job_status = db.scalar(select(models.Job.status).where(models.Job.key == f"purge_board:{board_id}"))
+    return {
+        "board_id": board_id,
+        "deleted_at": row.deleted_at,
+        "tasks_remaining": db.scalar(select(func.count()).where(models.Task.board_id == board_id)),
+        "tasks_purged": running["tasks_purged"] if running else None,
+        "running": job_status == "running",
+    }
+
+
+def changes_since(db: Session, user_id: int, since: int, limit: int = 1000, origin: int = None):
+    """Boards, tasks and deletions of `user_id` with change_seq > `since`.
+
+    About `limit` changes per call, but never splitting one change sequence
+    (a batch write) across calls; `next` is the token for the following call.
+    `origin` is the `since` the client's catch-up started from: while
+    ``has_more``, tokens are ``"<seq>.<origin>"``. A catch-up that started
+    before the purged tombstones gets ``reset`` and ``next`` 0.
+    """
+    origin = since if origin is None else origin
+    current = db.scalar(select(models.User.change_seq).where(models.User.id == user_id)) or 0
+    boards = and_(models.Board.owner_id == user_id, LIVE_BOARD)
+    tasks = models.Task.board_id.in_(select(models.Board.id).where(boards))
+    tombstones = models.Tombstone.owner_id == user_id
+
+    seqs = union_all(
+        select(models.Board.change_seq.label("seq")).where(boards, models.Board.change_seq > since),
+        select(models.Task.change_seq).where(tasks, models.Task.change_seq > since),
+        select(models.Tombstone.change_seq).where(tombstones, models.Tombstone.change_seq > since),
+    ).subquery()
+    cutoff = db.scalar(select(seqs.c.seq).order_by(seqs.c.seq).offset(limit).limit(1))
+    upper = current if cutoff is None else max(cutoff - 1, since + 1)
+
+    def window(column):
+        return and_(column > since, column <= upper)
+
+    deleted = [
+        {"entity": row.entity, "id": row.entity_id, "board_id": row.board_id}
+        for row in db.scalars(
+            select(models.Tombstone).where(tombstones, window(models.Tombstone.change_seq))
+            .order_by(models.Tombstone.change_seq)
+        )
+    ]
+    # read after the tombstones, so a purge committed in between is noticed.
+    # Checked against where the catch-up started: a full sync (0) needs no
+    # deletions, and the later pages of any catch-up only miss tombstones of
+    # what was deleted before it started
+    purged = db.scalar(select(models.User.tombstones_purged_seq).where(models.User.id == user_id)) or 0
+    if 0 < origin < purged:
+        return {"next": "0", "has_more": True, "reset": True}
+
+    return {
+        "boards": db.scalars(
+            select(models.Board).where(boards, window(models.Board.change_seq)).order_by(models.Board.change_seq)
+        ).all(),
+        "tasks": db.scalars(
+            select(models.Task).where(tasks, window(models.Task.change_seq)).order_by(models.Task.change_seq)
+        ).all(),
+        "deleted": deleted,
+        "next": f"{upper}.{origin}" if upper < current else str(upper),
+        "has_more": upper < current,
+    }
+
+
+def get_user(db: Session, user_id: int):
+    return db.query(models.User).filter(models.User.id == user_id).first()
+
+
+def get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+
+def create_user(db: Session, values: dict):
+    new_user = models.User(**values)
+    db.add(new_user)
+    db.flush()
+    # GET /users/me/stats reads this row; task writes keep it up to date
+    db.add(models.UserStats(user_id=new_user.id))
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+
+def update_user_password(db: Session, user_id: int, hashed_password: str):
+    db.execute(update(models.User).where(models.User.id == user_id).values(password=hashed_password))
+    db.commit()
+
+
+def board_query(db: Session, user_id: int, search: str = "", columns=None):
+    query = select(*(columns or (models.Board,))).where(models.Board.owner_id == user_id, LIVE_BOARD)
+    if search:
+        query = search_backends.get_backend(db).filter_boards(db, query, user_id, search)
+    return query
+
+
+def list_boards(db: Session, user_id: int, limit: int = 10, skip: int = 0, search: str = "", expand_tasks: bool = False, project: bool = False):
+    """Boards of `user_id`; `project` returns BoardSummaryOut-shaped dicts (not with `expand_tasks`)."""
+    if project:
+        columns = serialization.columns(models.Board, board_schemas.BoardSummaryOut)
+        return serialization.as_dicts(db.execute(board_query(db, user_id, search, columns).limit(limit).offset(skip)))
+    query = board_query(db, user_id, search).limit(limit).offset(skip)
+    if expand_tasks:
+        # one extra SELECT ... WHERE board_id IN (...) instead of one per board
+        query = query.options(selectinload(models.Board.tasks))
+    return db.scalars(query).all()
+
+
+def page_boards(db: Session, user_id: int, cursor: str = None, limit: int = 10, search: str = "", include_total: bool = False, project: bool = False):
+    columns = serialization.columns(models.Board, board_schemas.BoardSummaryOut) if project else None
+    query = board_query(db, user_id, search, columns)
+    boards, next_cursor = pagination.paginate(db, query, models.Board, cursor=cursor, limit=limit, as_rows=project)
+    if project:
+        boards = serialization.as_dicts(boards)
+    total = pagination.estimate_count(db, query) if include_total else None
+    return {"boards": boards, "next_cursor": next_cursor, "total": total}
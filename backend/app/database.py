@@ -1,20 +1,210 @@
-from sqlalchemy import create_engine 
+import contextvars
+import time
+
+from sqlalchemy import create_engine , event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from . import metrics
 from .config import settings
 
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+SQLALCHEMY_DATABASE_URL = settings.database_url or f"postgresql://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+
+# async drivers for the URL schemes we support
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str):
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited for a connection."""
+
+    engine_name = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.pool_checkout_timeouts.inc(engine=self.engine_name)
+            raise
+        finally:
+            metrics.pool_checkout_seconds.observe(time.perf_counter() - start, engine=self.engine_name)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    engine_name = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_name = "async"
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    engine_name = "sync"
+
+
+class TimedAsyncNullPool(_TimedCheckout, NullPool):
+    engine_name = "async"
+
+
+def engine_options(url: str, is_async: bool = False):
+    if url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/")):
+        # in-memory SQLite keeps its single-connection pool
+        return {}
+
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if settings.db_pool_mode == "null":
+        options["poolclass"] = TimedAsyncNullPool if is_async else TimedNullPool
+        if is_async and url.startswith("postgresql"):
+            # PgBouncer in transaction mode cannot keep server-side prepared statements
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return options
+
+
+def _set_statement_timeout(engine):
+    """Apply DB_STATEMENT_TIMEOUT_MS to every request on a Postgres engine.
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    Pooled connections get a session-level ``SET`` once, when they are opened.
+    Behind PgBouncer (null pool) session state would leak to other clients, so
+    the timeout is set with ``SET LOCAL`` at the start of each transaction.
+    """
+    if not settings.db_statement_timeout_ms or engine.dialect.name != "postgresql":
+        return
+    timeout = int(settings.db_statement_timeout_ms)
 
-Sessionlocal = sessionmaker(autocommit = False , autoflush = False , bind = engine)
+    if settings.db_pool_mode == "null":
+        @event.listens_for(engine, "begin")
+        def _per_transaction(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+    else:
+        @event.listens_for(engine, "connect")
+        def _per_connection(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET statement_timeout = {timeout}")
+            cursor.close()
+
+
+def _pool_status():
+    engines = [("sync", engine)]
+    if async_engine is not None:
+        engines.append(("async", async_engine.sync_engine))
+    for replica in replicas:
+        engines.append((replica.name, replica.engine))
+        if replica.async_engine is not None:
+            engines.append((f"{replica.name}-async", replica.async_engine.sync_engine))
+    samples = []
+    for name, current in engines:
+        pool = current.pool
+        if isinstance(pool, QueuePool):
+            samples += [
+                ({"engine": name, "state": "checked_out"}, pool.checkedout()),
+                ({"engine": name, "state": "idle"}, pool.checkedin()),
+                ({"engine": name, "state": "overflow"}, max(pool.overflow(), 0)),
+            ]
+    return samples
+
+
+# the sync engine is always available (alembic, scripts, streaming exports);
+# the async one is only built when DATABASE_ASYNC is enabled
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+_set_statement_timeout(engine)
+
+# expire_on_commit=False: handlers return rows loaded by INSERT/UPDATE ... RETURNING
+# and must not pay a refresh SELECT when the response is serialized
+Sessionlocal = sessionmaker(autocommit = False , autoflush = False , expire_on_commit = False , bind = engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.database_async:
+    ASYNC_DATABASE_URL = async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+    _set_statement_timeout(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine , autoflush = False , expire_on_commit = False)
+
+
+class Replica:
+    """A read replica's engines, and its lag as last measured by app/replicas.py."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, **engine_options(url))
+        _set_statement_timeout(self.engine)
+        self.async_engine = None
+        if settings.database_async:
+            self.async_engine = create_async_engine(async_url(url), **engine_options(async_url(url), is_async=True))
+            _set_statement_timeout(self.async_engine.sync_engine)
+        # seconds behind the primary; None until measured, or while unreachable
+        self.lag = None
+
+
+replicas = [
+    Replica(f"replica{index}", url.strip())
+    for index, url in enumerate(settings.database_replica_urls.split(","))
+    if url.strip()
+]
+
+# set per request by replicas.ReadRoutingMiddleware; None means the primary
+read_replica = contextvars.ContextVar("read_replica", default=None)
+
+metrics.Gauge("db_pool_connections", "Connections held by the pool, by state", _pool_status)
 
 Base = declarative_base()
 
-def get_db():
-    db = Sessionlocal()
+async def get_db():
+    """Yield an AsyncSession when DATABASE_ASYNC is set, a sync Session otherwise.
+
+    Either way, routes hand their data-access code to `run_db`. The session is
+    bound to the replica picked for this request, if any.
+    """
+    replica = read_replica.get()
+    if AsyncSessionLocal is not None:
+        options = {"bind": replica.async_engine} if replica is not None else {}
+        async with AsyncSessionLocal(**options) as db:
+            yield db
+        return
+
+    db = Sessionlocal(bind=replica.engine) if replica is not None else Sessionlocal()
     try:
-        yield db 
+        yield db
     finally:
-        db.close()    
\ No newline at end of file
+        # returning the connection to the pool issues a ROLLBACK
+        await run_in_threadpool(db.close)
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run sync data-access code `fn(session, *args, **kwargs)` without blocking the event loop.
+
+    On an AsyncSession this goes through `run_sync` (greenlet, async driver);
+    on a sync Session it runs in the threadpool as the old `def` routes did.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def release(db):
+    """Close `db` early, returning its connection before a long-lived response."""
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
@@ -0,0 +1,61 @@
+"""Task status and priority.
+
+Stored as smallint codes (`models.CodedEnum`); the API and CSV/NDJSON files
+use the labels. Codes follow the natural order, so ``ORDER BY priority``
+sorts by urgency rather than alphabetically.
+"""
+from enum import Enum
+
+from pydantic import BeforeValidator
+
+
+class CodedEnum(str, Enum):
+    def __new__(cls, label: str, code: int, *aliases):
+        member = str.__new__(cls, label)
+        member._value_ = label
+        member.code = code
+        member.aliases = aliases
+        return member
+
+    def __str__(self):
+        return self.value
+
+    @classmethod
+    def parse(cls, value):
+        """Member for a label, alias or code, case-insensitively."""
+        if isinstance(value, cls):
+            return value
+        for member in cls:
+            if value == member.code and not isinstance(value, bool):
+                return member
+            if isinstance(value, str) and value.strip().lower() in (member.value.lower(), *member.aliases):
+                return member
+        raise ValueError(f"must be one of: {', '.join(member.value for member in cls)}")
+
+    @classmethod
+    def from_code(cls, code: int):
+        for member in cls:
+            if member.code == code:
+                return member
+        raise ValueError(f"unknown {cls.__name__} code {code!r}")
+
+
+class TaskStatus(CodedEnum):
+    todo = ("To Do", 0, "todo", "pending", "open")
+    in_progress = ("In Progress", 1, "in-progress", "in_progress", "doing")
+    done = ("Done", 2, "completed", "complete", "closed")
+
+
+class TaskPriority(CodedEnum):
+    low = ("Low", 0)
+    medium = ("Medium", 1)
+    high = ("High", 2)
+
+
+def lenient(enum_cls, default=None):
+    """Pydantic validator: labels in any case and known aliases; empty means `default`."""
+    def validate(value):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return default
+        return enum_cls.parse(value)
+    return BeforeValidator(validate)
@@ -0,0 +1,208 @@
+"""Board change feed: task/board deltas pushed to subscribers as they commit.
+
+Writes stage an event on the session (`emit`); it is only delivered once the
+transaction commits, and dropped on rollback. Every event carries the board
+version it produced, which doubles as the resume token: a subscriber that
+reconnects with ``Last-Event-ID: <version>`` gets the buffered events it
+missed, or a ``reset`` event when they are no longer buffered.
+
+Notices (`NOTICES`, e.g. ``task.due``) change no data and so produce no
+version: they go to the subscribers connected at the time, past the version
+filter, without an SSE ``id`` (the client's resume point stays put) and are
+neither buffered nor replayed.
+
+EVENTS_BACKEND selects the fan-out:
+
+* ``local`` - in-process, for a single worker;
+* ``postgres`` - ``NOTIFY`` inside the writing transaction (so delivery is
+  tied to the commit) and one ``LISTEN`` connection per worker, which then
+  fans out locally. Works across workers and hosts.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from select import select as wait_readable
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .schemas.task import TaskOut
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "board_events"
+# NOTIFY payloads are limited to 8000 bytes
+MAX_NOTIFY_BYTES = 7900
+# event types that carry the board's current version without changing it
+NOTICES = {"task.due"}
+
+
+def task_payload(tasks):
+    return [TaskOut.model_validate(task).model_dump(mode="json") for task in tasks]
+
+
+def emit(db: Session, board_id: int, version: int, type: str, tasks=None, ids=None, board=None):
+    """Stage an event for delivery when `db` commits.
+
+    Large batches are sent as a payload-less ``board.changed``; clients refetch.
+    """
+    event = {"type": type, "board_id": board_id, "version": version}
+    if tasks is not None and len(tasks) > settings.events_max_tasks:
+        event["type"] = "board.changed"
+    elif tasks is not None:
+        event["tasks"] = task_payload(tasks)
+    if ids is not None:
+        event["ids"] = list(ids)
+    if board is not None:
+        event["board"] = board
+    broker.stage(db, event)
+
+
+class LocalBroker:
+    """Subscribers and a short replay buffer per board, all in this process."""
+
+    def __init__(self, replay_size: int):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._recent = defaultdict(lambda: deque(maxlen=replay_size))
+
+    def stage(self, db: Session, event: dict):
+        db.info.setdefault("board_events", []).append(event)
+
+    def deliver(self, event: dict):
+        """Fan out to subscribers; safe to call from any thread."""
+        with self._lock:
+            if event["type"] not in NOTICES:
+                self._recent[event["board_id"]].append(event)
+            subscribers = list(self._subscribers.get(event["board_id"], ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def missed(self, board_id: int, since: int, current: int):
+        """Buffered events after version `since`, or None when some of those up
+        to `current` are no longer buffered."""
+        with self._lock:
+            events = [e for e in self._recent.get(board_id, ()) if e["version"] > since]
+        if since < current and (not events or events[0]["version"] != since + 1):
+            return None
+        return events
+
+    async def subscribe(self, board_id: int):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        entry = (loop, queue)
+        with self._lock:
+            self._subscribers[board_id].add(entry)
+        return queue
+
+    def unsubscribe(self, board_id: int, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(board_id, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(board_id, None)
+
+
+class PostgresBroker(LocalBroker):
+    def __init__(self, replay_size: int, engine):
+        super().__init__(replay_size)
+        self._engine = engine
+        self._listener = None
+
+    def stage(self, db: Session, event: dict):
+        payload = json.dumps(event, separators=(",", ":"))
+        if len(payload.encode()) > MAX_NOTIFY_BYTES:
+            event = {"type": "board.changed", "board_id": event["board_id"], "version": event["version"]}
+            payload = json.dumps(event, separators=(",", ":"))
+        db.execute(select(func.pg_notify(CHANNEL, payload)))
+
+    async def subscribe(self, board_id: int):
+        self._start_listener()
+        return await super().subscribe(board_id)
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name="board-events", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                connection = self._engine.raw_connection()
+                try:
+                    dbapi_connection = connection.dbapi_connection
+                    dbapi_connection.autocommit = True
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                    while True:
+                        if wait_readable([dbapi_connection], [], [], 30) == ([], [], []):
+                            continue
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            notify = dbapi_connection.notifies.pop(0)
+                            self.deliver(json.loads(notify.payload))
+                finally:
+                    connection.invalidate()
+            except Exception:
+                # events committed while we reconnect are missed; clients see a reset
+                logger.exception("board events listener failed, reconnecting")
+                threading.Event().wait(1)
+
+
+def _make_broker():
+    if settings.events_backend == "postgres":
+        from .database import engine
+        return PostgresBroker(settings.events_replay_size, engine)
+    return LocalBroker(settings.events_replay_size)
+
+
+broker = _make_broker()
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_staged(session):
+    for staged in session.info.pop("board_events", ()):
+        broker.deliver(staged)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_staged(session, previous_transaction):
+    session.info.pop("board_events", None)
+
+
+def format_sse(event: dict):
+    data = f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+    return data if event["type"] in NOTICES else f"id: {event['version']}\n{data}"
+
+
+async def stream(board_id: int, since: int, current: int, is_disconnected):
+    """SSE body: events after version `since` (or a reset), then live ones until
+    the client leaves. `current` is the board version read when connecting."""
+    queue = await broker.subscribe(board_id)
+    try:
+        yield "retry: 3000\n\n"
+        # also covers writes committed between reading `current` and subscribing
+        missed = broker.missed(board_id, since, current)
+        if missed is None:
+            missed = [{"type": "reset", "board_id": board_id, "version": current}]
+        for event in missed:
+            yield format_sse(event)
+        since = max([since] + [event["version"] for event in missed])
+        while not await is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.events_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event["version"] <= since and event["type"] not in NOTICES:
+                continue
+            yield format_sse(event)
+            if event["type"] == "board.deleted":
+                return
+    finally:
+        broker.unsubscribe(board_id, queue)
@@ -0,0 +1,165 @@
+"""Conditional GETs and an optional shared response cache for board/task reads.
+
+Every board carries a ``version`` that each board or task write bumps in the
+same transaction. Read routes ask for that version first (one primary-key
+lookup that also checks ownership) and derive a strong ETag from it:
+
+* ``If-None-Match`` / ``If-Modified-Since`` that still match -> ``304`` with
+  no serialization at all;
+* otherwise, with RESPONSE_CACHE_BACKEND set, a body serialized earlier for the
+  same ETag is returned as-is; only a miss runs the real query.
+
+Cache keys embed the version, so a write can never serve a stale body; the
+explicit `invalidate` just frees the memory early.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from . import instrumentation, serialization
+from .cache import TTLCache
+from .config import settings
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._scopes = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes, scopes):
+        self._entries.set(key, value)
+        for scope in scopes:
+            keys = self._scopes.get(scope) or set()
+            keys.add(key)
+            self._scopes.set(scope, keys)
+
+    def invalidate(self, scope: str):
+        for key in self._scopes.pop(scope) or ():
+            self._entries.pop(key)
+
+
+class RedisBackend:
+    """Same interface on any Redis-protocol server (Redis, Valkey, KeyDB, ...)."""
+
+    def __init__(self, url: str, ttl: int, prefix: str = "taskmanager:http:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+
+    def get(self, key: str):
+        return self._client.get(self._prefix + key)
+
+    def set(self, key: str, value: bytes, scopes):
+        pipe = self._client.pipeline()
+        pipe.set(self._prefix + key, value, ex=self._ttl)
+        for scope in scopes:
+            pipe.sadd(self._prefix + scope, key)
+            pipe.expire(self._prefix + scope, self._ttl)
+        pipe.execute()
+
+    def invalidate(self, scope: str):
+        keys = self._client.smembers(self._prefix + scope)
+        if keys:
+            self._client.delete(*[self._prefix + key.decode() for key in keys])
+        self._client.delete(self._prefix + scope)
+
+
+def _make_backend():
+    if settings.response_cache_backend == "memory":
+        return MemoryBackend(settings.response_cache_max_entries, settings.response_cache_ttl_seconds)
+    if settings.response_cache_backend == "redis":
+        return RedisBackend(settings.redis_url, settings.response_cache_ttl_seconds)
+    return None
+
+
+backend = _make_backend()
+
+
+def board_scope(board_id: int):
+    return f"board:{board_id}"
+
+
+def owner_scope(owner_id: int):
+    return f"owner:{owner_id}"
+
+
+def invalidate(board_id: int = None, owner_id: int = None):
+    if backend is None:
+        return
+    if board_id is not None:
+        backend.invalidate(board_scope(board_id))
+    if owner_id is not None:
+        backend.invalidate(owner_scope(owner_id))
+
+
+def make_etag(request: Request, user_id: int, version: str):
+    # the same version can back different representations (query params)
+    variant = hashlib.sha1(f"{user_id}:{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    return f'"{version}-{variant}"'
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+_adapters = {}
+
+
+def serialize(schema, value, projected: bool = False):
+    """Validate ORM objects against `schema` and dump straight to JSON bytes.
+
+    `projected` values are plain dicts already shaped like `schema` (see
+    app/serialization.py) and are encoded as they are.
+    """
+    with instrumentation.span("serialize"):
+        if projected:
+            return serialization.dumps(value)
+        adapter = _adapters.get(schema)
+        if adapter is None:
+            adapter = _adapters[schema] = TypeAdapter(schema)
+        return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+async def respond(request: Request, user_id: int, version, scopes, schema, build, projected: bool = False):
+    """Answer a GET from its version: 304, cached body, or `await build()` serialized with `schema`.
+
+    `version` is ``(tag, last_modified)`` as returned by crud.board_version /
+    crud.boards_version; `projected` is passed on to `serialize`.
+    """
+    tag, last_modified = version
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    etag = make_etag(request, user_id, tag)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f"{scopes[0]}:{etag}"
+    body = backend.get(key) if backend is not None else None
+    if body is None:
+        body = serialize(schema, await build(), projected)
+        if backend is not None:
+            backend.set(key, body, scopes)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,202 @@
+"""Bulk import of tasks from CSV or NDJSON.
+
+The file is read incrementally and validated in chunks against
+`schemas.task.TaskCreate`; rows that fail are collected in a rejected-rows
+report instead of being silently altered. Valid rows are written with
+Postgres ``COPY`` (chunked executemany on other databases), one transaction
+per chunk.
+
+Command line::
+
+    python -m app.importer --board 3 backlog.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from . import crud, events, models, stats
+from .schemas.task import TaskCreate
+
+CHUNK_SIZE = 5000
+# rejected rows listed individually in the report; the count is always exact
+MAX_REPORTED_REJECTS = 1000
+
+COPY_COLUMNS = ["title", "description", "status", "priority", "due_date", "board_id", "change_seq"]
+# TaskCreate allows "description": null; tasks.description is NOT NULL
+DEFAULT_DESCRIPTION = TaskCreate.model_fields["description"].default
+
+
+def detect_format(filename: str):
+    return "csv" if (filename or "").lower().endswith(".csv") else "ndjson"
+
+
+def iter_records(binary_file, format: str):
+    """Yield (line_number, record_or_error) without reading the whole file."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # empty cells mean "not given", so TaskCreate defaults apply
+            yield reader.line_num, {key: value for key, value in record.items() if key and value != ""}
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+
+
+# NULL marker for COPY: unquoted it is NULL, quoted ("\N") it is that text
+COPY_NULL = "\\N"
+
+
+def _copy_value(value):
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    # always quoted, so an empty string stays an empty string and never reads as NULL
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_buffer(rows, dialect):
+    """`rows` as COPY ... (FORMAT csv, NULL '\\N') input."""
+    # COPY bypasses SQLAlchemy's type processing: apply it here (status and
+    # priority become their smallint codes)
+    processors = [models.Task.__table__.c[name].type.bind_processor(dialect) for name in COPY_COLUMNS]
+    buffer = io.StringIO()
+    for row in rows:
+        values = [
+            process(row[name]) if process else row[name]
+            for name, process in zip(COPY_COLUMNS, processors)
+        ]
+        buffer.write(",".join(_copy_value(value) for value in values))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_rows(db: Session, rows):
+    buffer = copy_buffer(rows, db.get_bind().dialect)
+    cursor = db.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _write_chunk(db: Session, rows, owner_id: int):
+    change_seq = crud.next_change_seq(db, owner_id)
+    for row in rows:
+        row["change_seq"] = change_seq
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, rows)
+    else:
+        db.execute(insert(models.Task), rows)
+    changes = stats.Changes()
+    for row in rows:
+        changes.add(row["status"], row["priority"])
+    stats.apply(db, owner_id, changes)
+    board_id = rows[0]["board_id"]
+    events.emit(db, board_id, crud.touch_board(db, board_id), "board.changed")
+    db.commit()
+
+
+def import_tasks(db: Session, board_id: int, binary_file, format: str = "csv", chunk_size: int = CHUNK_SIZE, on_progress=None):
+    """Import every valid row into `board_id` and return a report.
+
+    `on_progress(processed, imported, rejected)` is called after each chunk.
+    Board ownership must already have been checked by the caller.
+    """
+    report = {"processed": 0, "imported": 0, "rejected_count": 0, "rejected": []}
+    owner_id = db.scalar(select(models.Board.owner_id).where(models.Board.id == board_id))
+
+    def reject(line_number, errors):
+        report["rejected_count"] += 1
+        if len(report["rejected"]) < MAX_REPORTED_REJECTS:
+            report["rejected"].append({"line": line_number, "errors": errors})
+
+    chunk = []
+    for line_number, record in iter_records(binary_file, format):
+        report["processed"] += 1
+        if isinstance(record, Exception):
+            reject(line_number, [{"type": "json_invalid", "msg": str(record)}])
+            continue
+        try:
+            values = TaskCreate.model_validate(record).model_dump()
+        except ValidationError as exc:
+            reject(line_number, exc.errors(include_url=False, include_context=False))
+            continue
+        if values["description"] is None:
+            # null means "not given", like an empty CSV cell
+            values["description"] = DEFAULT_DESCRIPTION
+        values["board_id"] = board_id
+        chunk.append(values)
+
+        if len(chunk) >= chunk_size:
+            _write_chunk(db, chunk, owner_id)
+            report["imported"] += len(chunk)
+            chunk = []
+            if on_progress:
+                on_progress(report["processed"], report["imported"], report["rejected_count"])
+
+    if chunk:
+        _write_chunk(db, chunk, owner_id)
+        report["imported"] += len(chunk)
+    if on_progress:
+        on_progress(report["processed"], report["imported"], report["rejected_count"])
+
+    crud.board_changed(board_id)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import tasks into a board from CSV or NDJSON")
+    parser.add_argument("file", help="path to a .csv or .ndjson file, or - for stdin")
+    parser.add_argument("--board", type=int, required=True, help="id of the target board")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--report", help="write the rejected-rows report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    from .database import Sessionlocal
+
+    format = args.format or detect_format(args.file)
+    started = time.perf_counter()
+
+    def progress(processed, imported, rejected):
+        rate = processed / max(time.perf_counter() - started, 1e-9)
+        print(f"\r{processed} rows read, {imported} imported, {rejected} rejected ({rate:,.0f} rows/s)",
+              end="", file=sys.stderr, flush=True)
+
+    source = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+    with source, Sessionlocal() as db:
+        board = db.get(models.Board, args.board)
+        if board is None or board.deleted_at is not None:
+            parser.error(f"board {args.board} does not exist")
+        report = import_tasks(db, args.board, source, format, chunk_size=args.chunk_size, on_progress=progress)
+    print(file=sys.stderr)
+
+    if args.report:
+        with open(args.report, "w") as out:
+            json.dump(report, out, indent=2, default=str)
+    print(f"imported {report['imported']} of {report['processed']} rows, {report['rejected_count']} rejected")
+    return 1 if report["rejected_count"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
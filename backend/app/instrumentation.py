@@ -0,0 +1,216 @@
+"""Per-request metrics, Server-Timing and an opt-in sampling profiler.
+
+`RequestMetricsMiddleware` (a plain ASGI middleware, so streaming responses
+pass through untouched) keeps a `RequestStats` in a context variable for the
+duration of each request. SQLAlchemy cursor events and `span()` blocks (JWT
+decoding, bcrypt, serialization) add to it, and on the way out it becomes:
+
+* ``http_request_duration_seconds``, ``db_queries_per_request`` and
+  ``db_query_seconds_per_request`` histograms by route template - an N+1
+  shows up as a shifted queries-per-request distribution for one route;
+* a ``Server-Timing`` header (``db``, ``jwt``, ``bcrypt``, ``serialize``,
+  ``total``), visible in the browser's network panel.
+
+Profiling samples every thread's stack every PROFILE_INTERVAL_MS while a
+request runs. It is triggered for PROFILE_SAMPLE_RATE of requests, or by an
+``X-Profile: 1`` request header when PROFILE_HEADER is enabled. Profiles of
+requests slower than PROFILE_SLOW_MS (all header-triggered ones) are kept
+in memory and their id is returned in ``X-Profile-Id``; GET
+/debug/profiles/{id} serves them as folded stacks for flamegraph.pl or
+speedscope. Samples include whatever else the process was running at the
+time, so profile under light, representative load.
+"""
+import contextvars
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import metrics
+from .cache import TTLCache
+from .config import settings
+
+
+request_duration_seconds = metrics.Histogram(
+    "http_request_duration_seconds",
+    "Time to the response headers, by route template",
+    labelnames=("method", "route", "status"),
+)
+db_queries_per_request = metrics.Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request, by route template",
+    labelnames=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100, 250),
+)
+db_seconds_per_request = metrics.Histogram(
+    "db_query_seconds_per_request",
+    "Time spent executing SQL per request, by route template",
+    labelnames=("method", "route"),
+)
+span_seconds = metrics.Histogram(
+    "app_span_seconds",
+    "Time spent in instrumented sections (jwt, bcrypt, serialize)",
+    labelnames=("span",),
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "spans")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans = {}
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Time a section of request handling (also usable outside requests)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        span_seconds.observe(elapsed, span=name)
+        stats = _current.get()
+        if stats is not None:
+            stats.spans[name] = stats.spans.get(name, 0.0) + elapsed
+
+
+# the context (and so the RequestStats) follows the work into the threadpool
+# and into AsyncSession greenlets, so both engines report to the right request
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_query_start(exception_context):
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+class Sampler:
+    """Collects folded stacks of all threads (but its own) until stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = StackCounter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+profiles = TTLCache(maxsize=settings.profile_store_size, ttl=3600)
+
+
+def _should_profile(scope):
+    if settings.profile_header:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-profile" and value not in (b"", b"0"):
+                return True, True
+    if settings.profile_sample_rate and random.random() < settings.profile_sample_rate:
+        return True, False
+    return False, False
+
+
+def server_timing(stats: RequestStats, total: float):
+    parts = [f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"']
+    parts += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stats.spans.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        profile, forced = _should_profile(scope)
+        sampler = Sampler(settings.profile_interval_ms / 1000).start() if profile else None
+        start = time.perf_counter()
+        status_code = 500
+        # time to the response headers: long-lived streams (SSE, exports) don't skew it
+        duration = None
+
+        async def send_with_timing(message):
+            nonlocal status_code, sampler, duration
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = duration = time.perf_counter() - start
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, elapsed).encode()))
+                if sampler is not None:
+                    sampler.stop()
+                    if forced or elapsed * 1000 >= settings.profile_slow_ms:
+                        profile_id = secrets.token_hex(8)
+                        profiles.set(profile_id, sampler.folded())
+                        headers.append((b"x-profile-id", profile_id.encode()))
+                    sampler = None
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            _current.reset(token)
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": route.path if route is not None else "unmatched"}
+            if duration is None:
+                duration = time.perf_counter() - start
+            request_duration_seconds.observe(duration, status=status_code, **labels)
+            db_queries_per_request.observe(stats.queries, **labels)
+            db_seconds_per_request.observe(stats.db_seconds, **labels)
@@ -0,0 +1,199 @@
+"""Durable queue for work that shouldn't hold up a request.
+
+A job is a row in ``jobs``, inserted with `enqueue` in the transaction of the
+write that needs it: it exists exactly when that write commits. Workers
+(``python -m app.worker``, or JOB_INLINE_WORKERS threads inside the API
+process) claim due jobs with ``FOR UPDATE SKIP LOCKED``, so any number of
+them share the queue without waiting on each other, and run the handler
+registered for the job's kind:
+
+* returning normally deletes the job;
+* returning `Repeat` puts it back in the queue (periodic jobs);
+* raising retries it after an exponential backoff with jitter
+  (JOB_BACKOFF_SECONDS doubling up to JOB_BACKOFF_MAX_SECONDS), and after
+  ``max_attempts`` leaves it as ``failed`` with the error for inspection.
+
+A claim is a lease of JOB_LEASE_SECONDS: a worker that dies mid-job leaves
+the job to be claimed again when the lease runs out, so handlers must be
+safe to run twice. Long handlers call `extend_lease` as they make progress.
+"""
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import insert, select, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import metrics, models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+jobs_run = metrics.Counter("jobs_run_total", "Job attempts, by kind and outcome", labelnames=("kind", "outcome"))
+job_seconds = metrics.Histogram("job_seconds", "Time spent running jobs, by kind", labelnames=("kind",))
+
+# job kind -> fn(db, job)
+handlers = {}
+
+
+class Repeat(NamedTuple):
+    """Returned by a handler to run the job again after `delay` seconds."""
+    delay: float
+    payload: Optional[dict] = None
+
+
+def handler(kind: str):
+    """Register the decorated function as the handler of `kind` jobs."""
+    def register(fn):
+        handlers[kind] = fn
+        return fn
+    return register
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+def enqueue(db: Session, kind: str, payload: dict = None, key: str = None, delay: float = 0, max_attempts: int = None):
+    """Add a job to `db`'s transaction; it's claimable once that commits.
+
+    With a `key`, returns False (and adds nothing) while an unfinished job
+    with that key exists.
+    """
+    statement = insert(models.Job).values(
+        kind=kind,
+        payload=payload or {},
+        key=key,
+        run_at=now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    if key is None:
+        db.execute(statement)
+        return True
+    try:
+        with db.begin_nested():
+            db.execute(statement)
+    except IntegrityError:
+        return False
+    return True
+
+
+def claim(db: Session, limit: int = 1):
+    """Lease up to `limit` due jobs to the caller and commit; return them."""
+    started = now()
+    due = (
+        select(models.Job.id)
+        .where(models.Job.status != "failed", models.Job.run_at <= started)
+        .order_by(models.Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.execute(
+        update(models.Job)
+        .where(models.Job.id.in_(due.scalar_subquery()))
+        .values(status="running", attempts=models.Job.attempts + 1,
+                run_at=started + timedelta(seconds=settings.job_lease_seconds))
+        .returning(models.Job.id, models.Job.kind, models.Job.payload, models.Job.attempts, models.Job.max_attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return claimed
+
+
+def extend_lease(db: Session, job_id: int):
+    db.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id, models.Job.status == "running")
+        .values(run_at=now() + timedelta(seconds=settings.job_lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def backoff(attempts: int):
+    delay = min(settings.job_backoff_seconds * 2 ** (attempts - 1), settings.job_backoff_max_seconds)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def run(db: Session, job):
+    """Run one claimed job and record the outcome."""
+    started = time.perf_counter()
+    try:
+        fn = handlers.get(job.kind)
+        if fn is None:
+            raise LookupError(f"no handler for job kind {job.kind!r}")
+        result = fn(db, job)
+    except Exception as exc:
+        db.rollback()
+        final = job.attempts >= job.max_attempts
+        logger.warning("job %s (%s) attempt %s/%s failed", job.id, job.kind, job.attempts, job.max_attempts,
+                       exc_info=True)
+        values = {"last_error": f"{type(exc).__name__}: {exc}"[:2000]}
+        if final:
+            # frees the key, so the work can be queued again
+            values.update(status="failed", key=None)
+        else:
+            values.update(status="queued", run_at=now() + timedelta(seconds=backoff(job.attempts)))
+        db.execute(update(models.Job).where(models.Job.id == job.id).values(**values))
+        outcome = "failed" if final else "retry"
+    else:
+        # commits together with whatever the handler left uncommitted
+        if isinstance(result, Repeat):
+            values = {"status": "queued", "attempts": 0, "last_error": None,
+                      "run_at": now() + timedelta(seconds=result.delay)}
+            if result.payload is not None:
+                values["payload"] = result.payload
+            db.execute(update(models.Job).where(models.Job.id == job.id).values(**values))
+        else:
+            db.execute(delete(models.Job).where(models.Job.id == job.id))
+        outcome = "done"
+    db.commit()
+    jobs_run.inc(kind=job.kind, outcome=outcome)
+    job_seconds.observe(time.perf_counter() - started, kind=job.kind)
+    return outcome
+
+
+class Worker:
+    """`concurrency` threads claiming and running jobs until `stop`."""
+
+    def __init__(self, concurrency: int = 1, poll_interval: float = None):
+        self.concurrency = concurrency
+        self.poll_interval = settings.job_poll_seconds if poll_interval is None else poll_interval
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = None):
+        """Stop claiming; wait up to `timeout` for the jobs in hand to finish."""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_once(self):
+        """Claim and run one job; False when none was due."""
+        from .database import Sessionlocal
+
+        with Sessionlocal() as db:
+            claimed = claim(db)
+            for job in claimed:
+                run(db, job)
+        return bool(claimed)
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                busy = self.run_once()
+            except Exception:
+                logger.exception("job worker error")
+                busy = False
+            if not busy:
+                self._stopping.wait(self.poll_interval)
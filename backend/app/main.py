@@ -1,24 +1,51 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi import Depends
+from fastapi import Depends , HTTPException , status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 
-from . import models
+from . import models , metrics , instrumentation , serialization , worker , replicas , ratelimit , singleflight
+from .config import settings
 from .database import engine , get_db
 from sqlalchemy.orm import Session
-from .routers import users , boards , tasks ,auth
+from .routers import users , boards , tasks ,auth , events , sync
+
+@asynccontextmanager
+async def lifespan(app):
+    # queued jobs (board purges, reminders) run here unless dedicated workers take them
+    job_worker = worker.start(settings.job_inline_workers) if settings.job_inline_workers else None
+    yield
+    if job_worker is not None:
+        job_worker.stop(timeout=5)
+
+
+app  = FastAPI(default_response_class=serialization.DefaultResponse , lifespan=lifespan)
+
+# picks the database (primary or a read replica) get_db opens sessions on
+app.add_middleware(replicas.ReadRoutingMiddleware)
 
-app  = FastAPI()
+# identical GETs in flight share the leader's response, after routing ran once
+app.add_middleware(singleflight.CoalescingMiddleware)
 
+# every request takes a token, coalesced or not
+app.add_middleware(ratelimit.RateLimitMiddleware)
 
+# outside the rate limiter, so 429s carry CORS headers the browser can read
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://127.0.0.1:5500", "https://taskmanager-o1tb.onrender.com"],  # allow your frontend url
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    # read-your-writes marker clients may echo back (see app/replicas.py)
+    expose_headers=[replicas.HEADER],
 )
 
+# added last = outermost, so the timings include CORS handling
+app.add_middleware(instrumentation.RequestMetricsMiddleware)
+
 #models.Base.metadata.create_all(bind = engine)
 
 
@@ -26,9 +53,24 @@ app.include_router(users.router)
 app.include_router(boards.router)
 app.include_router(auth.router)
 app.include_router(tasks.router)
+app.include_router(events.router)
+app.include_router(sync.router)
 
 
 
 @app.get("/")
-def root():
-    return {"message": "Hello , World!"}
\ No newline at end of file
+async def root():
+    return {"message": "Hello , World!"}
+
+
+@app.get("/metrics" , response_class=PlainTextResponse , include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.render() , media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles/{id}" , response_class=PlainTextResponse , include_in_schema=False)
+async def get_profile(id:str):
+    # folded stacks: flamegraph.pl, speedscope or inferno read them directly
+    profile = instrumentation.profiles.get(id) if (settings.profile_header or settings.profile_sample_rate) else None
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND , detail=f"profile {id} not found")
+    return PlainTextResponse(profile)
@@ -0,0 +1,115 @@
+"""Minimal Prometheus-style metrics, rendered in the text exposition format by GET /metrics."""
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels: dict):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{str(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {value}"
+
+
+class Gauge(Metric):
+    """A gauge whose value is read from `callback` at scrape time."""
+    type = "gauge"
+
+    def __init__(self, name, help, callback):
+        super().__init__(name, help)
+        self.callback = callback
+
+    def samples(self):
+        for labels, value in self.callback():
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [per-bucket counts, sum, count]
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        for key, counts, total, count in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {bucket_count}"
+            yield f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {total}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+REGISTRY = []
+
+
+def render():
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a connection from the pool",
+    labelnames=("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+pool_checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT",
+    labelnames=("engine",),
+)
@@ -1,11 +1,55 @@
-from sqlalchemy import Column , Integer , String , DateTime , ForeignKey
+from sqlalchemy import Column , Integer , BigInteger , SmallInteger , String , Date , DateTime , ForeignKey , Index , JSON
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
 from .database import Base 
+from .enums import TaskStatus , TaskPriority
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text 
 
 
+class db_now(FunctionElement):
+    """Server-side "now" for column defaults: now() on Postgres.
+
+    SQLite's CURRENT_TIMESTAMP has whole seconds only and a different text
+    format than SQLAlchemy binds, which breaks keyset cursors; use a
+    microsecond timestamp in SQLAlchemy's format there instead.
+    """
+    type = TIMESTAMP(timezone=True)
+    inherit_cache = True
+
+
+@compiles(db_now)
+def _db_now(element , compiler , **kw):
+    return "now()"
+
+
+@compiles(db_now , 'sqlite')
+def _db_now_sqlite(element , compiler , **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+class SmallIntEnum(TypeDecorator):
+    """An `enums.CodedEnum` stored as its smallint code; accepts members or labels."""
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self , enum_class):
+        super().__init__()
+        self.enum_class = enum_class
+
+    def process_bind_param(self , value , dialect):
+        return None if value is None else self.enum_class.parse(value).code
+
+    def process_literal_param(self , value , dialect):
+        return str(self.process_bind_param(value , dialect))
+
+    def process_result_value(self , value , dialect):
+        return None if value is None else self.enum_class.from_code(value)
+
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -13,7 +57,11 @@ class User(Base):
     name = Column(String , nullable=False)
     email = Column(String , nullable=False , unique=True)
     password = Column(String , nullable = False )
-    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = text('now()'))
+    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
+    # last change sequence handed out to this user's boards/tasks (GET /sync)
+    change_seq = Column(BigInteger , nullable=False , server_default = text('0'))
+    # tombstones up to this change sequence are gone (app/tombstones.py)
+    tombstones_purged_seq = Column(BigInteger , nullable=False , server_default = text('0'))
 
 class Board(Base):
     __tablename__ = 'boards'
@@ -21,10 +69,27 @@ class Board(Base):
     id = Column(Integer , primary_key=True)
     title = Column(String , nullable=False )
     description = Column(String , nullable= False)
-    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = text('now()'))
+    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
     owner_id = Column(Integer , ForeignKey('users.id' , ondelete='CASCADE') , nullable=False)
+    # bumped by every write to the board or its tasks (ETags, conditional GETs)
+    version = Column(Integer , nullable=False , server_default = text('1'))
+    updated_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
+    change_seq = Column(BigInteger , nullable=False , server_default = text('0'))
+    # set by DELETE /boards/{id}: the board is hidden at once and its tasks
+    # are purged in the background (app/purge.py)
+    deleted_at = Column(TIMESTAMP(timezone=True) , nullable=True)
     owner = relationship('User')
-    tasks = relationship('Task' , backref='board' , cascade='all, delete-orphan')
+    # passive_deletes: leave the tasks to ON DELETE CASCADE / the purge
+    # instead of loading every one of them to delete it
+    tasks = relationship('Task' , backref='board' , cascade='all, delete-orphan' , passive_deletes=True)
+
+    __table_args__ = (
+        # owner's boards, newest first (GET /boards, /boards/page, /boards/summary)
+        Index('ix_boards_owner_id_created_at' , 'owner_id' , 'created_at' , 'id'),
+        Index('ix_boards_owner_id_change_seq' , 'owner_id' , 'change_seq'),
+        # boards waiting to be purged
+        Index('ix_boards_deleted_at' , 'deleted_at' , postgresql_where=text('deleted_at IS NOT NULL')),
+    )
 
 
 
@@ -34,9 +99,97 @@ class Task(Base):
     id = Column(Integer , primary_key=True )
     title = Column(String , nullable=False) 
     description = Column(String , nullable=False, default="No description provided")
-    status = Column(String , nullable=False , default = "To Do")
-    priority = Column(String , nullable=False , default = "Medium")
+    status = Column(SmallIntEnum(TaskStatus) , nullable=False , default = TaskStatus.todo , server_default = text('0'))
+    priority = Column(SmallIntEnum(TaskPriority) , nullable=False , default = TaskPriority.medium , server_default = text('1'))
     due_date = Column(DateTime , nullable =True)
-    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = text('now()'))
+    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
     board_id = Column(Integer , ForeignKey('boards.id' , ondelete='CASCADE') , nullable=False)
-    
\ No newline at end of file
+    change_seq = Column(BigInteger , nullable=False , server_default = text('0'))
+
+    __table_args__ = (
+        # a board's tasks, newest first (GET /boards/{id}/tasks and its keyset pages)
+        Index('ix_tasks_board_id_created_at' , 'board_id' , 'created_at' , 'id'),
+        # per-board status/priority/due date filters and aggregates
+        Index('ix_tasks_board_id_status_priority_due_date' , 'board_id' , 'status' , 'priority' , 'due_date'),
+        Index('ix_tasks_board_id_change_seq' , 'board_id' , 'change_seq'),
+        # ?sort=priority,due_date (most urgent first)
+        Index('ix_tasks_board_id_priority_due_date' , 'board_id' , text('priority DESC') , 'due_date'),
+        # ?overdue=true: open tasks by due date
+        Index('ix_tasks_board_id_open_due_date' , 'board_id' , 'due_date' ,
+              postgresql_where=text(f'status <> {TaskStatus.done.code}')),
+        # open tasks across all boards by due date (the due-date reminder scan)
+        Index('ix_tasks_open_due_date' , 'due_date' , 'id' ,
+              postgresql_where=text(f'status <> {TaskStatus.done.code}')),
+    )
+
+
+class Tombstone(Base):
+    """A deleted board or task, kept so GET /sync can report the deletion."""
+    __tablename__ = 'tombstones'
+
+    # INTEGER on SQLite, where only that type auto-increments
+    id = Column(BigInteger().with_variant(Integer , 'sqlite') , primary_key=True)
+    owner_id = Column(Integer , ForeignKey('users.id' , ondelete='CASCADE') , nullable=False)
+    entity = Column(String , nullable=False)
+    entity_id = Column(Integer , nullable=False)
+    board_id = Column(Integer , nullable=False)
+    change_seq = Column(BigInteger , nullable=False)
+    deleted_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
+
+    __table_args__ = (
+        Index('ix_tombstones_owner_id_change_seq' , 'owner_id' , 'change_seq'),
+        # the retention purge, oldest first
+        Index('ix_tombstones_deleted_at' , 'deleted_at'),
+    )
+
+
+class Job(Base):
+    """Deferred work for app/worker.py (see app/jobs.py).
+
+    ``run_at`` is when the job may next be claimed: its due time while
+    queued, the end of the claiming worker's lease while running.
+    """
+    __tablename__ = 'jobs'
+
+    id = Column(BigInteger().with_variant(Integer , 'sqlite') , primary_key=True)
+    kind = Column(String , nullable=False)
+    payload = Column(JSON , nullable=False)
+    # at most one unfinished job per key (periodic jobs, one purge per board)
+    key = Column(String , nullable=True , unique=True)
+    status = Column(String , nullable=False , server_default = text("'queued'"))
+    run_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
+    attempts = Column(Integer , nullable=False , server_default = text('0'))
+    max_attempts = Column(Integer , nullable=False)
+    last_error = Column(String , nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True) , nullable=False , server_default = db_now())
+
+    __table_args__ = (
+        # the claim query: claimable jobs, oldest due first
+        Index('ix_jobs_run_at' , 'run_at' , postgresql_where=text("status <> 'failed'")),
+    )
+
+
+class UserStats(Base):
+    """Task counts over a user's live boards, kept in step with every task
+    write (app/stats.py) and created with the user: GET /users/me/stats reads
+    this one row. Overdue counts change with the clock and are counted on read."""
+    __tablename__ = 'user_stats'
+
+    user_id = Column(Integer , ForeignKey('users.id' , ondelete='CASCADE') , primary_key=True)
+    # one column per TaskStatus / TaskPriority member: status_<name>, priority_<name>
+    status_todo = Column(Integer , nullable=False , server_default = text('0'))
+    status_in_progress = Column(Integer , nullable=False , server_default = text('0'))
+    status_done = Column(Integer , nullable=False , server_default = text('0'))
+    priority_low = Column(Integer , nullable=False , server_default = text('0'))
+    priority_medium = Column(Integer , nullable=False , server_default = text('0'))
+    priority_high = Column(Integer , nullable=False , server_default = text('0'))
+
+
+class UserStatsDaily(Base):
+    """Tasks a user created and completed per (UTC) day, for trends."""
+    __tablename__ = 'user_stats_daily'
+
+    user_id = Column(Integer , ForeignKey('users.id' , ondelete='CASCADE') , primary_key=True)
+    day = Column(Date , primary_key=True)
+    created = Column(Integer , nullable=False , server_default = text('0'))
+    completed = Column(Integer , nullable=False , server_default = text('0'))
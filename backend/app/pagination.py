@@ -0,0 +1,51 @@
+"""Opaque keyset cursors over ``(created_at, id)`` plus cheap row-count estimates."""
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.orm import Session
+
+
+def encode_cursor(created_at: datetime, id: int):
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(db: Session, query, model, cursor: str = None, limit: int = 100, as_rows: bool = False):
+    """Return one page of `query` newest first, and the cursor of the next page.
+
+    Rows after the cursor are found with ``(created_at, id) < (:created_at, :id)``,
+    which an index on ``(..., created_at, id)`` answers without scanning the
+    rows of earlier pages. `as_rows` returns result rows of a column query
+    (which must include created_at and id) instead of entities.
+    """
+    if cursor:
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(*decode_cursor(cursor)))
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+    rows = db.execute(query).all() if as_rows else db.scalars(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def estimate_count(db: Session, query):
+    """Planner row estimate on Postgres, exact COUNT(*) elsewhere."""
+    if db.get_bind().dialect.name == "postgresql":
+        compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return db.execute(select(func.count()).select_from(query.subquery())).scalar()
@@ -0,0 +1,147 @@
+"""Background purge of deleted boards.
+
+DELETE /boards/{id} only stamps ``boards.deleted_at`` and returns; every read
+and write filters on ``deleted_at IS NULL``, so the board disappears at once.
+Its tasks are deleted here afterwards, PURGE_CHUNK_SIZE rows per short
+transaction, so neither the request nor the purge holds locks on a whole
+board's worth of rows. The board row goes last, once no task refers to it.
+
+The purge is a ``purge_board`` job (app/jobs.py) queued in the deleting
+transaction, so it survives restarts and runs on whichever worker claims it.
+The same purge runs in the foreground from the command line::
+
+    python -m app.purge [--board ID] [--chunk-size N]
+
+Progress: GET /boards/{id}/purge, and the board_purge_* metrics.
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from . import jobs, metrics, models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+tasks_purged = metrics.Counter("board_purge_tasks_deleted_total", "Tasks deleted by board purges")
+boards_purged = metrics.Counter("board_purges_completed_total", "Deleted boards whose purge finished")
+
+# board id -> {"tasks_purged", "started_at"} for purges running in this process
+progress = {}
+
+metrics.Gauge("board_purges_in_progress", "Board purges running in this process",
+              lambda: [({}, len(progress))])
+
+
+def purge_chunk(db: Session, board_id: int, chunk_size: int):
+    """Delete up to `chunk_size` tasks of `board_id` in one transaction; return how many."""
+    ids = select(models.Task.id).where(models.Task.board_id == board_id).limit(chunk_size)
+    if db.get_bind().dialect.name == "postgresql":
+        # two purges of the same board (two workers after a restart) share the work
+        ids = ids.with_for_update(skip_locked=True)
+    deleted = db.execute(
+        delete(models.Task).where(models.Task.id.in_(ids.scalar_subquery())),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    db.commit()
+    return deleted
+
+
+def purge_board(db: Session, board_id: int, chunk_size: int = None, pause: float = None, on_progress=None):
+    """Delete a deleted board's tasks chunk by chunk, then the board itself.
+
+    Returns the number of tasks deleted. `on_progress(deleted)` is called after
+    each chunk. Does nothing to boards that aren't marked deleted.
+    """
+    chunk_size = chunk_size or settings.purge_chunk_size
+    pause = settings.purge_pause_ms / 1000 if pause is None else pause
+    if db.scalar(select(models.Board.deleted_at).where(models.Board.id == board_id)) is None:
+        return 0
+
+    total = 0
+    while True:
+        deleted = purge_chunk(db, board_id, chunk_size)
+        if not deleted:
+            break
+        total += deleted
+        tasks_purged.inc(deleted)
+        if on_progress:
+            on_progress(total)
+        if pause:
+            time.sleep(pause)
+
+    # only once empty: rows another purge still holds locked are left to it
+    removed = db.execute(
+        delete(models.Board).where(
+            models.Board.id == board_id,
+            models.Board.deleted_at.is_not(None),
+            ~exists().where(models.Task.board_id == board_id),
+        )
+    ).rowcount
+    db.commit()
+    if removed:
+        boards_purged.inc()
+    return total
+
+
+def schedule(db: Session, board_id: int):
+    """Queue the purge of `board_id` in `db`'s transaction (once per board)."""
+    jobs.enqueue(db, "purge_board", {"board_id": board_id}, key=f"purge_board:{board_id}")
+
+
+@jobs.handler("purge_board")
+def run_purge(db: Session, job):
+    board_id = job.payload["board_id"]
+    state = progress[board_id] = {"tasks_purged": 0, "started_at": datetime.now(timezone.utc)}
+    renewed = time.monotonic()
+
+    def on_progress(deleted):
+        nonlocal renewed
+        state["tasks_purged"] = deleted
+        # the purge can outlast a lease; keep it while making progress
+        if time.monotonic() - renewed > settings.job_lease_seconds / 3:
+            jobs.extend_lease(db, job.id)
+            renewed = time.monotonic()
+
+    try:
+        purge_board(db, board_id, on_progress=on_progress)
+    finally:
+        progress.pop(board_id, None)
+
+
+def pending_boards(db: Session):
+    return db.scalars(
+        select(models.Board.id).where(models.Board.deleted_at.is_not(None)).order_by(models.Board.deleted_at)
+    ).all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Purge deleted boards and their tasks")
+    parser.add_argument("--board", type=int, help="only this board (default: every deleted board)")
+    parser.add_argument("--chunk-size", type=int, default=settings.purge_chunk_size)
+    args = parser.parse_args(argv)
+
+    from .database import Sessionlocal
+
+    with Sessionlocal() as db:
+        board_ids = [args.board] if args.board else pending_boards(db)
+        for board_id in board_ids:
+            started = time.perf_counter()
+
+            def report(deleted):
+                rate = deleted / max(time.perf_counter() - started, 1e-9)
+                print(f"\rboard {board_id}: {deleted} tasks deleted ({rate:,.0f} rows/s)",
+                      end="", file=sys.stderr, flush=True)
+
+            deleted = purge_board(db, board_id, chunk_size=args.chunk_size, on_progress=report)
+            print(f"\rboard {board_id}: purged, {deleted} tasks deleted", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Token-bucket rate limits per client IP and per user (RATE_LIMIT_BACKEND).
+
+RATE_LIMIT_RULES is a comma-separated list of ``METHOD PATH KEY RATE``:
+
+* METHOD: an HTTP method or ``*``;
+* PATH: a route template such as ``/boards/{board_id}/tasks/`` (``{...}``
+  matches one path segment) or ``*`` for every path;
+* KEY: ``ip`` (the client address) or ``user`` (the id in a valid bearer
+  token; requests without one are only subject to ``ip`` rules);
+* RATE: ``N/S``, a bucket of N requests refilled over S seconds, so bursts
+  of N are fine but the sustained rate is N/S per second.
+
+Every matching rule takes a token from its own bucket; the first empty one
+answers ``429`` with ``Retry-After``. Buckets live in process memory
+("memory") or in any Redis-protocol server shared by all workers ("redis",
+REDIS_URL), where the refill and take are one atomic script.
+
+The limiter fails open: when the backend errors (Redis unreachable, ...) the
+request is let through, counted in ``rate_limit_errors_total`` and logged,
+rather than the limiter taking the whole API down with it.
+"""
+import asyncio
+import logging
+import math
+import re
+import time
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+
+from . import Oauth2, metrics
+from .cache import TTLCache
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+limited_requests = metrics.Counter(
+    "rate_limited_requests_total",
+    "Requests answered with 429, by rule",
+    labelnames=("rule",),
+)
+limiter_errors = metrics.Counter(
+    "rate_limit_errors_total",
+    "Requests let through unchecked because the rate limit backend failed",
+)
+
+
+class Rule:
+    def __init__(self, spec: str):
+        try:
+            method, path, key, rate = spec.split()
+            capacity, seconds = rate.split("/")
+            self.capacity = int(capacity)
+            self.rate = self.capacity / float(seconds)
+        except ValueError:
+            raise ValueError(f"invalid rate limit rule {spec!r}, expected 'METHOD PATH ip|user N/SECONDS'")
+        if key not in ("ip", "user"):
+            raise ValueError(f"invalid rate limit rule {spec!r}: key must be 'ip' or 'user'")
+        self.spec = spec
+        self.method = method.upper()
+        self.key = key
+        self.path = None if path == "*" else re.compile(
+            "^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(path)) + "$"
+        )
+
+    def matches(self, method: str, path: str):
+        return self.method in ("*", method) and (self.path is None or self.path.match(path) is not None)
+
+
+def parse_rules(spec: str):
+    return [Rule(part.strip()) for part in spec.split(",") if part.strip()]
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = 100000, ttl: float = 3600):
+        # a bucket untouched for longer than its refill time is full again,
+        # so forgetting it is harmless
+        self._buckets = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+
+    async def take(self, key: str, capacity: int, rate: float):
+        """Take a token; return (allowed, seconds until one is available)."""
+        async with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets.set(key, (tokens, now))
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+# KEYS[1] bucket; ARGV capacity, rate per second. Uses the server clock, so
+# workers with skewed clocks still share one bucket correctly.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """Same interface on any Redis-protocol server (Redis, Valkey, KeyDB, ...)."""
+
+    def __init__(self, url: str, prefix: str = "taskmanager:ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(TAKE_SCRIPT)
+        self._prefix = prefix
+
+    async def take(self, key: str, capacity: int, rate: float):
+        allowed, tokens = await self._take(keys=[self._prefix + key], args=[capacity, rate])
+        return bool(allowed), 0.0 if allowed else (1 - float(tokens)) / rate
+
+
+def _make_backend():
+    if settings.rate_limit_backend == "memory":
+        return MemoryBackend()
+    if settings.rate_limit_backend == "redis":
+        return RedisBackend(settings.redis_url)
+    return None
+
+
+backend = _make_backend()
+rules = parse_rules(settings.rate_limit_rules) if backend is not None else []
+
+# bearer token -> user id, verified once per token rather than per request
+_token_users = TTLCache(maxsize=10000, ttl=60)
+_invalid_token = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+def _user_id(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            user_id = _token_users.get(token)
+            if user_id is None:
+                try:
+                    user_id = Oauth2.verify_access_token(token, _invalid_token).id
+                except HTTPException:
+                    user_id = ""
+                _token_users.set(token, user_id)
+            return user_id or None
+    return None
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not rules:
+            return await self.app(scope, receive, send)
+
+        method, path = scope["method"], scope["path"]
+        user_id = None
+        for index, rule in enumerate(rules):
+            if not rule.matches(method, path):
+                continue
+            if rule.key == "user":
+                user_id = user_id or _user_id(scope)
+                if user_id is None:
+                    continue
+                identity = f"user:{user_id}"
+            else:
+                identity = f"ip:{scope['client'][0] if scope.get('client') else '-'}"
+            try:
+                allowed, retry_after = await backend.take(f"{index}:{identity}", rule.capacity, rule.rate)
+            except Exception:
+                # fail open: no limiting beats no API
+                limiter_errors.inc()
+                logger.warning("rate limit backend failed, letting the request through", exc_info=True)
+                break
+            if not allowed:
+                limited_requests.inc(rule=rule.spec)
+                response = JSONResponse(
+                    {"detail": "Too many requests, retry later"},
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+                return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,78 @@
+"""Due-date reminders: a periodic ``due_scan`` job.
+
+Every DUE_REMINDER_INTERVAL_SECONDS the scan finds the open tasks whose due
+date came within DUE_REMINDER_LEAD_MINUTES since the previous scan - a range
+read of ``ix_tasks_open_due_date``, however many tasks exist - and announces
+them on their board's change feed as a ``task.due`` event with the task ids.
+It changes no data, so it is a notice (see app/events.py): it reaches the
+clients connected at the time, which don't refetch on it, and is not
+replayed to those that reconnect later.
+
+Where the previous scan stopped (due date and task id) travels in the job's
+payload, so each task is announced once even across restarts, and a backlog
+after downtime is worked off DUE_REMINDER_BATCH_SIZE tasks at a time. A task
+created (or moved) to a due date the scan has already passed is not
+announced: with the default lead of 0 that is one already overdue.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from . import events, jobs, metrics, models
+from .config import settings
+from .enums import TaskStatus
+
+KEY = "due_scan"
+
+reminders_sent = metrics.Counter("due_reminders_total", "Tasks announced as due")
+
+
+def due_tasks(db: Session, after_due, after_id: int, until, limit: int):
+    """Open tasks on live boards due in (`after_due`/`after_id`, `until`], soonest first."""
+    return db.execute(
+        select(models.Task.id, models.Task.board_id, models.Task.due_date, models.Board.version)
+        .join(models.Board, models.Board.id == models.Task.board_id)
+        .where(
+            models.Task.status != TaskStatus.done,
+            models.Task.due_date <= until,
+            or_(models.Task.due_date > after_due,
+                and_(models.Task.due_date == after_due, models.Task.id > after_id)),
+            models.Board.deleted_at.is_(None),
+        )
+        .order_by(models.Task.due_date, models.Task.id)
+        .limit(limit)
+    ).all()
+
+
+@jobs.handler(KEY)
+def scan(db: Session, job):
+    # due dates are naive local times, like everywhere else (crud.is_overdue)
+    until = datetime.now() + timedelta(minutes=settings.due_reminder_lead_minutes)
+    after_due = datetime.fromisoformat(job.payload["after_due"]) if "after_due" in job.payload else until
+    after_id = job.payload.get("after_id", 0)
+
+    rows = due_tasks(db, after_due, after_id, until, settings.due_reminder_batch_size)
+    by_board = defaultdict(list)
+    for row in rows:
+        by_board[(row.board_id, row.version)].append(row.id)
+    for (board_id, version), ids in by_board.items():
+        events.emit(db, board_id, version, "task.due", ids=ids)
+    reminders_sent.inc(len(rows))
+
+    if rows:
+        after_due, after_id = rows[-1].due_date, rows[-1].id
+    elif until > after_due:
+        after_due, after_id = until, 0
+    full = len(rows) == settings.due_reminder_batch_size
+    # events go out when the worker commits the rescheduled job
+    return jobs.Repeat(0 if full else settings.due_reminder_interval_seconds,
+                       {"after_due": after_due.isoformat(), "after_id": after_id})
+
+
+def ensure_scheduled(db: Session):
+    """Queue the scan unless it already is (starts from now: no reminders for the past)."""
+    if settings.due_reminder_interval_seconds > 0:
+        jobs.enqueue(db, KEY, key=KEY)
+        db.commit()
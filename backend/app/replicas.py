@@ -0,0 +1,238 @@
+"""Routing of GET requests to read replicas (DATABASE_REPLICA_URLS).
+
+`ReadRoutingMiddleware` decides per request which database `get_db` opens
+its session on:
+
+* anything but GET/HEAD goes to the primary;
+* so does every GET from a client that wrote in the last
+  REPLICA_STICKY_SECONDS (read-your-writes). A successful write marks its
+  bearer token as writer until then, in this process ("memory") or in a
+  Redis-protocol server shared by all workers ("redis", REDIS_URL), per
+  REPLICA_STICKY_BACKEND. The response also carries that time as
+  ``X-DB-Primary-Until``; a client that echoes the header back on its reads
+  gets the primary from any worker without shared state. Cookies are not
+  used: cross-origin fetches don't send them without credentials mode.
+  When the marks can't be read (Redis down) GETs go to the primary; a
+  write whose mark can't be stored still answers normally;
+* other GETs go round-robin to the replicas at most REPLICA_MAX_LAG_SECONDS
+  behind, as measured every REPLICA_CHECK_INTERVAL_SECONDS by a background
+  thread. When none qualifies (lagging, unreachable, not measured yet) they
+  go to the primary.
+
+Lag comes from the WAL replay position on Postgres. Other databases have no
+replication to measure and count as in sync while they answer, so two
+SQLite files work as local stand-ins for a primary and a replica.
+
+``db_reads_total`` counts where GETs went and why; ``db_replica_lag_seconds``
+has the last measurement (NaN while unreachable); ``replica_sticky_errors_total``
+counts failed mark reads and writes.
+"""
+import hashlib
+import itertools
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy import text
+
+from . import database, metrics
+from .cache import TTLCache
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-DB-Primary-Until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+reads = metrics.Counter(
+    "db_reads_total",
+    "GET requests by the database they read from",
+    labelnames=("target", "reason"),
+)
+sticky_errors = metrics.Counter(
+    "replica_sticky_errors_total",
+    "Recent-writer marks that could not be read or stored",
+    labelnames=("op",),
+)
+metrics.Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of each read replica at the last check",
+    lambda: [({"replica": replica.name}, "NaN" if replica.lag is None else replica.lag) for replica in database.replicas],
+)
+
+
+def measure_lag(replica):
+    with replica.engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            return float(conn.execute(LAG_QUERY).scalar())
+        conn.execute(text("SELECT 1"))
+        return 0.0
+
+
+class LagMonitor:
+    """Re-measures every replica's lag in a daemon thread, started on first use."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="replica-lag", daemon=True)
+                self._thread.start()
+
+    def check(self):
+        for replica in database.replicas:
+            try:
+                replica.lag = measure_lag(replica)
+            except Exception:
+                if replica.lag is not None:
+                    logger.warning("replica %s unreachable, reading from the primary", replica.name, exc_info=True)
+                replica.lag = None
+
+    def _run(self):
+        while True:
+            self.check()
+            time.sleep(self.interval)
+
+
+monitor = LagMonitor(settings.replica_check_interval_seconds)
+
+_next = itertools.count()
+
+
+class MemoryMarks:
+    """Bearer tokens that wrote recently, in this process."""
+
+    def __init__(self, ttl: float):
+        self._marks = TTLCache(maxsize=10000, ttl=ttl)
+
+    async def mark(self, key: str, until: float):
+        self._marks.set(key, until)
+
+    async def until(self, key: str):
+        return self._marks.get(key)
+
+
+class RedisMarks:
+    """Same interface on any Redis-protocol server, so every worker sees every write."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "taskmanager:primary_until:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("REPLICA_STICKY_BACKEND=redis needs the 'redis' package") from exc
+        self._client = redis.Redis.from_url(url)
+        self._ttl_ms = math.ceil(ttl * 1000)
+        self._prefix = prefix
+
+    async def mark(self, key: str, until: float):
+        await self._client.set(self._prefix + key, f"{until:.3f}", px=self._ttl_ms)
+
+    async def until(self, key: str):
+        value = await self._client.get(self._prefix + key)
+        return float(value) if value is not None else None
+
+
+def _make_marks():
+    if settings.replica_sticky_backend == "redis":
+        return RedisMarks(settings.redis_url, settings.replica_sticky_seconds)
+    return MemoryMarks(settings.replica_sticky_seconds)
+
+
+marks = _make_marks()
+
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _writer_key(scope):
+    authorization = _header(scope, b"authorization")
+    return hashlib.sha1(authorization.encode()).hexdigest() if authorization else None
+
+
+async def _wrote_recently(scope):
+    try:
+        echoed = float(_header(scope, HEADER.lower().encode()) or 0)
+    except ValueError:
+        echoed = 0
+    if echoed > time.time():
+        return True
+    key = _writer_key(scope)
+    if key is None:
+        return False
+    try:
+        until = await marks.until(key)
+    except Exception:
+        # can't tell whether the client just wrote: don't risk a stale read
+        sticky_errors.inc(op="read")
+        logger.warning("recent-writer marks unavailable, reading from the primary", exc_info=True)
+        return True
+    return until is not None and until > time.time()
+
+
+def choose():
+    """A replica within the lag budget (round-robin), or None for the primary."""
+    fresh = [replica for replica in database.replicas
+             if replica.lag is not None and replica.lag <= settings.replica_max_lag_seconds]
+    if not fresh:
+        return None
+    return fresh[next(_next) % len(fresh)]
+
+
+class ReadRoutingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not database.replicas:
+            return await self.app(scope, receive, send)
+        monitor.start()
+
+        if scope["method"] in ("GET", "HEAD"):
+            replica = None
+            if await _wrote_recently(scope):
+                reason = "read_your_writes"
+            else:
+                replica = choose()
+                reason = "replica" if replica is not None else "lagging"
+            reads.inc(target=replica.name if replica is not None else "primary", reason=reason)
+            token = database.read_replica.set(replica)
+            try:
+                return await self.app(scope, receive, send)
+            finally:
+                database.read_replica.reset(token)
+
+        if scope["method"] not in WRITE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_marking_writer(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + settings.replica_sticky_seconds
+                key = _writer_key(scope)
+                if key is not None:
+                    try:
+                        await marks.mark(key, until)
+                    except Exception:
+                        # the write has committed; the echoed header still works
+                        sticky_errors.inc(op="write")
+                        logger.warning("could not mark a recent writer", exc_info=True)
+                header = (HEADER.lower().encode(), f"{until:.3f}".encode())
+                message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+
+        await self.app(scope, receive, send_marking_writer)
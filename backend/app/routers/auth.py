@@ -1,7 +1,7 @@
 from fastapi import FastAPI , Depends , HTTPException , status , APIRouter
-from .. import models , schemas
+from .. import models , schemas , crud
 from sqlalchemy.orm import Session 
-from ..database import get_db 
+from ..database import get_db , run_db
 from .. import utils , Oauth2
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -12,12 +12,16 @@ router = APIRouter(
 
 
 @router.post("/login" , response_model = schemas.user.Token)
-def login(user_credentials: OAuth2PasswordRequestForm = Depends(), db:Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == user_credentials.username).first()
+async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), db:Session = Depends(get_db)):
+    user = await run_db(db, crud.get_user_by_email, user_credentials.username)
     if not user:
         raise HTTPException(status_code = status.HTTP_403_FORBIDDEN , detail="Invalid Credentials")
-    if not utils.pwd_context.verify(user_credentials.password , user.password):
+    valid , new_hash = await utils.verify_and_update_async(user_credentials.password , user.password)
+    if not valid:
         raise HTTPException(status_code = status.HTTP_403_FORBIDDEN , detail="Invalid Credentials")
+    if new_hash:
+        # stored hash predates the current BCRYPT_ROUNDS: upgrade it transparently
+        await run_db(db, crud.update_user_password, user.id, new_hash)
     
 
     access_token = Oauth2.create_access_token(data ={"user_id" : user.id})
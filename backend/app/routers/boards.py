@@ -1,8 +1,11 @@
-from fastapi import APIRouter , Depends , HTTPException , status , Response
-from .. import models , Oauth2
+import time
+from fastapi import APIRouter , Depends , HTTPException , status , Response , Request
+from .. import models , Oauth2 , crud , httpcache
 from ..schemas import board 
 from sqlalchemy.orm import Session 
-from ..database import get_db
+from ..database import get_db , run_db
+from ..config import settings
+from typing import Optional
 
 
 
@@ -13,51 +16,63 @@ router = APIRouter(
 
 
 @router.post("/" , response_model=board.BoardOut , status_code=status.HTTP_201_CREATED)
-def create_board(board:board.BoardCreate , db:Session = Depends(get_db), current_user: int = Depends(Oauth2.get_current_user)):
-    new_board = models.Board(**board.model_dump(), owner_id=current_user.id)
-    db.add(new_board)
-    db.commit()
-    db.refresh(new_board)
-    return new_board
+async def create_board(board:board.BoardCreate , db:Session = Depends(get_db), current_user: int = Depends(Oauth2.get_current_user)):
+    return await run_db(db, crud.create_board, current_user.id, board.model_dump())
 
 
-@router.get("/" , response_model = list[board.BoardOut])
-def get_boards(db:Session = Depends(get_db), current_user:int = Depends(Oauth2.get_current_user) , limit:int = 10 , skip:int = 0 , search :str =""):
-    boards = db.query(models.Board).filter(models.Board.owner_id == current_user.id).filter(models.Board.title.contains(search)).limit(limit).offset(skip).all()
-    return boards
+@router.get("/" , response_model = list[board.BoardListItem])
+async def get_boards(request:Request , db:Session = Depends(get_db), current_user:int = Depends(Oauth2.get_current_user) , limit:int = 10 , skip:int = 0 , search :str ="" , expand :str = ""):
+    # ?expand=tasks embeds each board's tasks; otherwise boards are returned without them
+    expand_tasks = "tasks" in expand.split(",")
+    schema = board.BoardOut if expand_tasks else board.BoardSummaryOut
+    project = settings.fast_json and not expand_tasks
+    version = await run_db(db, crud.boards_version, current_user.id)
+    return await httpcache.respond(
+        request, current_user.id, version, [httpcache.owner_scope(current_user.id)], list[schema],
+        lambda: run_db(db, crud.list_boards, current_user.id, limit=limit, skip=skip, search=search, expand_tasks=expand_tasks, project=project),
+        project
+    )
+
+@router.get("/summary" , response_model = list[board.BoardWithStats])
+async def get_board_summaries(request:Request , db:Session = Depends(get_db), current_user:int = Depends(Oauth2.get_current_user) , limit:int = 10 , skip:int = 0 , search :str =""):
+    tag, _ = await run_db(db, crud.boards_version, current_user.id)
+    # overdue counts change with the clock, not only with writes, so there is
+    # no Last-Modified: If-Modified-Since alone would keep a stale count
+    tag = f"{tag}o{int(time.time() // 60)}"
+    return await httpcache.respond(
+        request, current_user.id, (tag, None), [httpcache.owner_scope(current_user.id)], list[board.BoardWithStats],
+        lambda: run_db(db, crud.board_summaries, current_user.id, limit=limit, skip=skip, search=search),
+        settings.fast_json
+    )
+
+@router.get("/page" , response_model = board.BoardList)
+async def get_boards_page(request:Request , db:Session = Depends(get_db), current_user:int = Depends(Oauth2.get_current_user) , cursor :Optional[str] = None , limit:int = 10 , search :str ="" , include_total :bool = False):
+    # keyset pagination: pass the returned next_cursor back to fetch the following page
+    version = await run_db(db, crud.boards_version, current_user.id)
+    return await httpcache.respond(
+        request, current_user.id, version, [httpcache.owner_scope(current_user.id)], board.BoardList,
+        lambda: run_db(db, crud.page_boards, current_user.id, cursor=cursor, limit=limit, search=search, include_total=include_total, project=settings.fast_json),
+        settings.fast_json
+    )
 
 @router.get("/{id}" , response_model=board.BoardOut)
-def get_board(id:int , db:Session = Depends(get_db) , current_user:int = Depends(Oauth2.get_current_user)):
-    board = db.query(models.Board).filter(models.Board.id ==id).first()
-    if not board:
-        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND , detail = f"board with id {id} not found")
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(status_code = status.HTTP_403_FORBIDDEN , detail = f"Not authorized to perform this action")
-    return board
+async def get_board(id:int , request:Request , db:Session = Depends(get_db) , current_user:int = Depends(Oauth2.get_current_user)):
+    version = await run_db(db, crud.board_version, id, current_user.id)
+    return await httpcache.respond(
+        request, current_user.id, version, [httpcache.board_scope(id)], board.BoardOut,
+        lambda: run_db(db, crud.get_board, id, current_user.id)
+    )
 
 @router.delete("/{id}" , status_code=status.HTTP_204_NO_CONTENT)
-def delete_board(id:int , db:Session = Depends(get_db) , current_user:int = Depends(Oauth2.get_current_user)):
-    board_query = db.query(models.Board).filter(models.Board.id == id)
-    board = board_query.first()
-    if not board:
-        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND , detail = f"board with id {id} not found")
-    
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(status_code = status.HTTP_403_FORBIDDEN , detail = f"Not authorized to perform this action")
-
-    board_query.delete(synchronize_session=False)
-    db.commit()
+async def delete_board(id:int , db:Session = Depends(get_db) , current_user:int = Depends(Oauth2.get_current_user)):
+    await run_db(db, crud.delete_board, id, current_user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+@router.get("/{id}/purge" , response_model=board.BoardPurge)
+async def get_board_purge(id:int , db:Session = Depends(get_db) , current_user:int = Depends(Oauth2.get_current_user)):
+    # a deleted board's tasks are removed in the background; 404 once it is gone
+    return await run_db(db, crud.purge_status, id, current_user.id)
+
 @router.put("/{id}" , response_model=board.BoardOut)
-def update_board(id:int , updated_board:board.BoardUpdate , db:Session = Depends(get_db), current_user :int = Depends(Oauth2.get_current_user)):
-    board_query = db.query(models.Board).filter(models.Board.id== id )
-    board = board_query.first()
-    if not board:
-        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND , detail = f"board with id {id} not found")
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(status_code = status.HTTP_403_FORBIDDEN , detail = f"Not authorized to perform this action")
-    board_query.update(updated_board.model_dump(), synchronize_session=False)
-    db.commit()
-    db.refresh(board)
-    return board
\ No newline at end of file
+async def update_board(id:int , updated_board:board.BoardUpdate , db:Session = Depends(get_db), current_user :int = Depends(Oauth2.get_current_user)):
+    return await run_db(db, crud.update_board, id, current_user.id, updated_board.model_dump())
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from .. import Oauth2, crud, events
+from ..config import settings
+from ..database import get_db, release, run_db
+from typing import Optional
+
+router = APIRouter(
+    prefix="/boards/{board_id}",
+    tags=["Events"]
+)
+
+
+@router.post("/events/token")
+async def board_events_token(board_id: int, db: Session = Depends(get_db), current_user: int = Depends(Oauth2.get_current_user)):
+    """Short-lived token for opening this board's events as ?token="""
+    await run_db(db, crud.check_board_access, board_id, current_user.id)
+    return {"token": Oauth2.create_stream_token(current_user.id, board_id), "expires_in": settings.events_token_ttl_seconds}
+
+
+@router.get("/events")
+async def board_events(
+    board_id: int, 
+    request: Request, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user_for_stream), 
+    last_event_id: Optional[int] = Header(None), 
+    since: Optional[int] = None
+):
+    """Server-sent events for task/board changes; resume with Last-Event-ID (or ?since=).
+    Browsers authenticate with ?token= from POST /events/token"""
+    version, _ = await run_db(db, crud.board_version, board_id, current_user.id)
+    # the stream can stay open for hours; don't hold a pooled connection meanwhile
+    await release(db)
+    resume_from = last_event_id if last_event_id is not None else since
+    return StreamingResponse(
+        events.stream(board_id, version if resume_from is None else resume_from, version, request.is_disconnected), 
+        media_type="text/event-stream", 
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
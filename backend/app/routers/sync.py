@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from .. import Oauth2, crud
+from ..database import get_db, run_db
+from ..schemas import sync
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sync"]
+)
+
+
+@router.get("/", response_model=sync.SyncOut)
+async def get_changes(
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user), 
+    since: str = "0", 
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """Boards and tasks changed, and entities deleted, since the `next` token of the previous sync"""
+    seq, _, origin = since.partition(".")
+    try:
+        since_seq = int(seq)
+        origin_seq = int(origin) if origin else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+    return await run_db(db, crud.changes_since, current_user.id, since_seq, limit=limit, origin=origin_seq)
@@ -1,11 +1,17 @@
 # tasks.py - Fixed version
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import time
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session 
-from .. import models, Oauth2
-from ..database import get_db
+from .. import models, Oauth2, crud, export, httpcache, importer
+from ..database import Sessionlocal
+from starlette.concurrency import run_in_threadpool
+from ..database import get_db, run_db
 from ..schemas import task
+from typing import Optional, List
 from datetime import datetime
-from typing import Optional
+from ..config import settings
+from ..enums import TaskStatus, TaskPriority
 
 router = APIRouter(
     prefix="/boards/{board_id}/tasks",
@@ -13,167 +19,223 @@ router = APIRouter(
 )
 
 
+def _parse_enum(enum_cls, values, name: str):
+    """Members for ?name=a,b&name=c, or None when not given"""
+    if not values:
+        return None
+    try:
+        return [enum_cls.parse(value) for raw in values for value in raw.split(",") if value.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {name}: {exc}")
+
+
+def task_filters(
+    status_filter: Optional[List[str]] = Query(None, alias="status"), 
+    priority: Optional[List[str]] = Query(None), 
+    due_before: Optional[datetime] = None, 
+    due_after: Optional[datetime] = None, 
+    overdue: Optional[bool] = None
+):
+    """Shared list filters: ?status=To Do,In Progress&priority=High&due_before=...&overdue=true"""
+    return {
+        "status": _parse_enum(TaskStatus, status_filter, "status"), 
+        "priority": _parse_enum(TaskPriority, priority, "priority"), 
+        "due_before": due_before, 
+        "due_after": due_after, 
+        "overdue": overdue, 
+    }
+
+
 @router.post("/", response_model=task.TaskOut, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     board_id: int, 
     task_data: task.TaskCreate, 
     db: Session = Depends(get_db), 
     current_user: int = Depends(Oauth2.get_current_user)
 ):
     """Create a new task in a specific board"""
-    # Check if board exists and user owns it
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Board with id {board_id} not found"
-        )
-    
-    if board.owner_id != int(current_user.id):
+    return await run_db(db, crud.create_task, board_id, current_user.id, task_data.model_dump())
+
+
+@router.post(":batch", response_model=task.TaskBatchCreateResult)
+async def batch_create_tasks(
+    board_id: int, 
+    batch: task.TaskBatchCreate, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user)
+):
+    """Create many tasks in one transaction; invalid items are reported by index"""
+    if len(batch.tasks) > settings.task_batch_max_items:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="Not authorized to perform this action"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, 
+            detail=f"At most {settings.task_batch_max_items} tasks per batch"
         )
-    
-    # Convert due_date string to datetime if provided
-    task_dict = task_data.model_dump()
-    if task_dict.get('due_date'):
-        try:
-            # Handle date format from frontend (YYYY-MM-DD)
-            if isinstance(task_dict['due_date'], str):
-                task_dict['due_date'] = datetime.strptime(task_dict['due_date'], '%Y-%m-%d')
-        except ValueError:
-            task_dict['due_date'] = None
-    
-    # Create new task
-    new_task = models.Task(**task_dict, board_id=board_id)
-    db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
-    
-    return new_task
+    return await run_db(db, crud.batch_create_tasks, board_id, current_user.id, batch.tasks)
+
+
+@router.patch(":batch", response_model=task.TaskBatchUpdateResult)
+async def batch_update_tasks(
+    board_id: int, 
+    batch: task.TaskBatchUpdate, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user)
+):
+    """Set status and/or priority on tasks selected by ids and/or current status/priority"""
+    values = batch.model_dump(include={"status", "priority"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to update")
+    if batch.ids is None and batch.where_status is None and batch.where_priority is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Select tasks with ids, where_status or where_priority")
+    return await run_db(
+        db, crud.batch_update_tasks, board_id, current_user.id, 
+        ids=batch.ids, where_status=batch.where_status, where_priority=batch.where_priority, values=values
+    )
+
+
+@router.delete(":batch", response_model=task.TaskBatchDeleteResult)
+async def batch_delete_tasks(
+    board_id: int, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user), 
+    ids: Optional[List[int]] = Query(None), 
+    status_filter: Optional[str] = Query(None, alias="status"), 
+    priority: Optional[str] = None
+):
+    """Delete tasks selected by ids and/or status/priority"""
+    if ids is None and status_filter is None and priority is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Select tasks with ids, status or priority")
+    status_filter = _parse_enum(TaskStatus, [status_filter], "status")[0] if status_filter else None
+    priority = _parse_enum(TaskPriority, [priority], "priority")[0] if priority else None
+    return await run_db(db, crud.batch_delete_tasks, board_id, current_user.id, ids=ids, status=status_filter, priority=priority)
+
+
+async def _cached(request: Request, db, board_id: int, user_id: int, schema, build, projected: bool = False, clock: bool = False):
+    """Conditional/cached GET of data that only changes with the board's version
+    (and the minute, with `clock`: ?overdue= results change as due dates pass)"""
+    version = await run_db(db, crud.board_version, board_id, user_id)
+    if clock:
+        # no Last-Modified either: If-Modified-Since alone would skip the minute
+        version = (f"{version[0]}o{int(time.time() // 60)}", None)
+    return await httpcache.respond(request, user_id, version, [httpcache.board_scope(board_id)], schema, build, projected)
 
 
 @router.get("/", response_model=list[task.TaskOut])
-def get_tasks(
+async def get_tasks(
     board_id: int, 
+    request: Request, 
     db: Session = Depends(get_db), 
     current_user: int = Depends(Oauth2.get_current_user), 
     limit: int = 100, 
     skip: int = 0, 
-    search: Optional[str] = ""
+    search: Optional[str] = "", 
+    filters: dict = Depends(task_filters), 
+    sort: Optional[str] = Query(None, description="e.g. priority,due_date; priority sorts High first, prefix - to reverse")
 ):
-    """Get all tasks from a specific board"""
-    # Check if board exists and user owns it
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Board with id {board_id} not found"
-        )
-    
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="Not authorized to perform this action"
-        )
-    
-    # Build query for tasks
-    query = db.query(models.Task).filter(models.Task.board_id == board_id)
-    
-    # Apply search filter if provided
-    if search:
-        query = query.filter(
-            models.Task.title.contains(search) | 
-            models.Task.description.contains(search)
-        )
-    
-    # Apply pagination
-    tasks = query.order_by(models.Task.created_at.desc()).limit(limit).offset(skip).all()
-    
-    return tasks
+    """Get the tasks of a specific board, optionally filtered and sorted"""
+    return await _cached(request, db, board_id, current_user.id, list[task.TaskOut], 
+        lambda: run_db(db, crud.list_tasks, board_id, current_user.id, 
+            limit=limit, skip=skip, search=search, filters=filters, sort=sort, project=settings.fast_json
+        ), 
+        projected=settings.fast_json, clock=filters["overdue"] is not None
+    )
+
+
+@router.get("/page", response_model=task.TaskList)
+async def get_tasks_page(
+    board_id: int, 
+    request: Request, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user), 
+    cursor: Optional[str] = None, 
+    limit: int = 100, 
+    search: Optional[str] = "", 
+    include_total: bool = False, 
+    filters: dict = Depends(task_filters)
+):
+    """Get one page of tasks (newest first); pass the returned next_cursor to fetch the next one"""
+    return await _cached(request, db, board_id, current_user.id, task.TaskList, 
+        lambda: run_db(db, crud.page_tasks, board_id, current_user.id, 
+            cursor=cursor, limit=limit, search=search, include_total=include_total, filters=filters, 
+            project=settings.fast_json
+        ), 
+        projected=settings.fast_json, clock=filters["overdue"] is not None
+    )
+
+
+@router.get("/search", response_model=list[task.TaskSearchHit])
+async def search_tasks(
+    board_id: int, 
+    q: str, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user), 
+    limit: int = 20
+):
+    """Full-text search within a board, ranked, with <b>-highlighted matches"""
+    return await run_db(db, crud.search_tasks, board_id, current_user.id, q, limit=limit)
+
+
+@router.get("/export")
+async def export_tasks(
+    board_id: int, 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user), 
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$")
+):
+    """Stream every task of a board as NDJSON or CSV"""
+    await run_db(db, crud.check_board_access, board_id, current_user.id)
+    return StreamingResponse(
+        export.stream_tasks(board_id, format), 
+        media_type=export.MEDIA_TYPES[format], 
+        headers={"Content-Disposition": f'attachment; filename="board-{board_id}-tasks.{format}"'}
+    )
+
+
+def _run_import(board_id: int, upload: UploadFile, format: str):
+    with Sessionlocal() as import_db:
+        return importer.import_tasks(import_db, board_id, upload.file, format)
+
+
+@router.post("/import", response_model=task.TaskImportReport)
+async def import_tasks(
+    board_id: int, 
+    file: UploadFile = File(...), 
+    db: Session = Depends(get_db), 
+    current_user: int = Depends(Oauth2.get_current_user), 
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$")
+):
+    """Bulk import tasks from a CSV or NDJSON upload; invalid rows are reported, not imported"""
+    await run_db(db, crud.check_board_access, board_id, current_user.id)
+    return await run_in_threadpool(_run_import, board_id, file, format or importer.detect_format(file.filename))
 
 
 @router.get("/{id}", response_model=task.TaskOut)
-def get_task(
+async def get_task(
     board_id: int, 
     id: int, 
+    request: Request, 
     db: Session = Depends(get_db), 
     current_user: int = Depends(Oauth2.get_current_user)
 ):
     """Get a specific task by ID"""
-    # Check if board exists and user owns it
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Board with id {board_id} not found"
-        )
-    
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="Not authorized to perform this action"
-        )
-    
-    # Get the specific task
-    task_obj = db.query(models.Task).filter(
-        models.Task.id == id, 
-        models.Task.board_id == board_id
-    ).first()
-    
-    if not task_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Task with id {id} not found in board {board_id}"
-        )
-    
-    return task_obj
+    return await _cached(request, db, board_id, current_user.id, task.TaskOut, 
+        lambda: run_db(db, crud.get_task, board_id, id, current_user.id)
+    )
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     board_id: int, 
     id: int, 
     db: Session = Depends(get_db), 
     current_user: int = Depends(Oauth2.get_current_user)
 ):
     """Delete a specific task"""
-    # Check if board exists and user owns it
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Board with id {board_id} not found"
-        )
-    
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="Not authorized to perform this action"
-        )
-    
-    # Find and delete the task
-    task_query = db.query(models.Task).filter(
-        models.Task.id == id, 
-        models.Task.board_id == board_id
-    )
-    task_obj = task_query.first()
-    
-    if not task_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Task with id {id} not found in board {board_id}"
-        )
-    
-    task_query.delete(synchronize_session=False)
-    db.commit()
-    
+    await run_db(db, crud.delete_task, board_id, id, current_user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.put("/{id}", response_model=task.TaskOut)
-def update_task(
+async def update_task(
     board_id: int, 
     id: int, 
     updated_task: task.TaskUpdate, 
@@ -181,49 +243,9 @@ def update_task(
     current_user: int = Depends(Oauth2.get_current_user)
 ):
     """Update a specific task"""
-    # Check if board exists and user owns it
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
-    if not board:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Board with id {board_id} not found"
-        )
-    
-    if board.owner_id != int(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail="Not authorized to perform this action"
-        )
-    
-    # Find the task to update
-    task_query = db.query(models.Task).filter(
-        models.Task.id == id, 
-        models.Task.board_id == board_id
-    )
-    task_obj = task_query.first()
-    
-    if not task_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail=f"Task with id {id} not found in board {board_id}"
-        )
-    
-    # Prepare update data
-    update_dict = updated_task.model_dump(exclude_unset=True)
-    
-    # Handle due_date conversion if provided
-    if 'due_date' in update_dict and update_dict['due_date']:
-        try:
-            if isinstance(update_dict['due_date'], str):
-                update_dict['due_date'] = datetime.strptime(update_dict['due_date'], '%Y-%m-%d')
-        except ValueError:
-            update_dict['due_date'] = None
-    
-    # Update the task
-    task_query.update(update_dict, synchronize_session=False)
-    db.commit()
-    
-    # Refresh to get updated task
-    db.refresh(task_obj)
-    
-    return task_obj
\ No newline at end of file
+    # an empty status/priority (null after validation) means "leave as is"
+    update_dict = {
+        key: value for key, value in updated_task.model_dump(exclude_unset=True).items() 
+        if value is not None or key == "due_date"
+    }
+    return await run_db(db, crud.update_task, board_id, id, current_user.id, update_dict)
@@ -1,9 +1,9 @@
-from fastapi import APIRouter , Depends , HTTPException , status
-from .. import models  
+from fastapi import APIRouter , Depends , HTTPException , status , Query
+from .. import models , crud , Oauth2 , stats
 from ..schemas import user  
 from sqlalchemy.orm import Session 
 from .. import utils
-from ..database import get_db
+from ..database import get_db , run_db
 
 router = APIRouter(
     prefix = "/users",
@@ -12,21 +12,23 @@ router = APIRouter(
 
 
 @router.post("/", response_model=user.UserOut  , status_code=status.HTTP_201_CREATED)
-def create_user(user:user.UserCreate , db:Session = Depends(get_db)):
+async def create_user(user:user.UserCreate , db:Session = Depends(get_db)):
     # check if the use exists
-    existing_user = db.query(models.User).filter(models.User.email == user.email).first()
+    existing_user = await run_db(db, crud.get_user_by_email, user.email)
     if existing_user:
         raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST , detail="Email already registered")
-    new_user = models.User(name = user.name , email = user.email , password = user.password)
-    new_user.password = utils.hash(new_user.password)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    hashed_password = await utils.hash_async(user.password)
+    return await run_db(db, crud.create_user, {"name": user.name, "email": user.email, "password": hashed_password})
+
+@router.get("/me/stats", response_model=user.UserStats)
+async def get_my_stats(db:Session = Depends(get_db), current_user:int = Depends(Oauth2.get_current_user),
+                       bucket:str = Query("day", pattern="^(day|week|month)$"), days:int = Query(30, ge=1, le=366)):
+    # counters kept up to date by the task writes: one row, not a scan of every task
+    return await run_db(db, stats.user_stats, current_user.id, bucket=bucket, days=days)
 
 @router.get("/{id}", response_model=user.UserOut)
-def get_user(id:int , db:Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == id ).first()
+async def get_user(id:int , db:Session = Depends(get_db)):
+    user = await run_db(db, crud.get_user, id)
     if not user:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND , detail = f"user with id {id} not found")
     
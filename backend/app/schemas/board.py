@@ -1,6 +1,6 @@
 from pydantic import BaseModel                            
 from datetime import datetime
-from typing import List 
+from typing import List , Dict , Union , Optional
 from .task import TaskOut    
 
 
@@ -14,13 +14,42 @@ class BoardCreate(BoardBase):
 
 class BoardUpdate(BoardBase):
     pass
-class BoardOut(BoardBase):
+
+class BoardSummaryOut(BoardBase):
     id : int
     created_at : datetime
     owner_id :int
-    tasks : List[TaskOut] = []
 
     class Config:
         from_attributes = True
-        
 
+class BoardOut(BoardSummaryOut):
+    tasks : List[TaskOut] = []
+
+class BoardList(BaseModel):
+    boards : List[BoardSummaryOut] = []
+    next_cursor : Optional[str] = None
+    total : Optional[int] = None
+
+# list responses: lean boards by default, BoardOut when ?expand=tasks
+BoardListItem = Union[BoardOut, BoardSummaryOut]
+
+
+class BoardStats(BaseModel):
+    total : int = 0
+    completed : int = 0
+    overdue : int = 0
+    by_status : Dict[str, int] = {}
+    by_priority : Dict[str, int] = {}
+
+class BoardWithStats(BoardSummaryOut):
+    stats : BoardStats
+
+
+class BoardPurge(BaseModel):
+    board_id : int
+    deleted_at : datetime
+    tasks_remaining : int
+    # known while this worker is the one purging the board
+    tasks_purged : Optional[int] = None
+    running : bool = False
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List
+from .board import BoardSummaryOut
+from .task import TaskOut
+
+
+class Deletion(BaseModel):
+    entity: str
+    id: int
+    board_id: int
+
+class SyncOut(BaseModel):
+    boards: List[BoardSummaryOut] = []
+    tasks: List[TaskOut] = []
+    deleted: List[Deletion] = []
+    # pass back as ?since= on the next sync (opaque)
+    next: str
+    # more changes are waiting; call again right away with `next`
+    has_more: bool = False
+    # the token is older than the deletions still on record
+    # (TOMBSTONE_RETENTION_DAYS): drop local data and sync again with `next`
+    reset: bool = False
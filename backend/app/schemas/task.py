@@ -1,12 +1,19 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Annotated, Optional, List, Any, Dict
 from datetime import datetime
+from ..enums import TaskStatus, TaskPriority, lenient
+
+# labels in any case ("done", "completed", ...); empty means "not given"
+Status = Annotated[TaskStatus, lenient(TaskStatus, TaskStatus.todo)]
+Priority = Annotated[TaskPriority, lenient(TaskPriority, TaskPriority.medium)]
+OptionalStatus = Annotated[Optional[TaskStatus], lenient(TaskStatus)]
+OptionalPriority = Annotated[Optional[TaskPriority], lenient(TaskPriority)]
 
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = "No description provided"
-    status: Optional[str] = "To Do"
-    priority: Optional[str] = "Medium"
+    status: Status = TaskStatus.todo
+    priority: Priority = TaskPriority.medium
     due_date: Optional[datetime] = None
     
 
@@ -16,8 +23,8 @@ class TaskCreate(TaskBase):
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    status: Optional[str] = None
-    priority: Optional[str] = None
+    status: OptionalStatus = None
+    priority: OptionalPriority = None
     due_date: Optional[datetime] = None
 
 class TaskOut(TaskBase):
@@ -28,9 +35,58 @@ class TaskOut(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskSearchHit(TaskOut):
+    rank: float
+    highlight: str
+
 class TaskList(BaseModel):
     tasks: List[TaskOut] = []
-    total: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+
+class BatchItemError(BaseModel):
+    index: int
+    errors: Any
+
+class BatchItemCreated(BaseModel):
+    index: int
+    task: TaskOut
+
+class TaskBatchCreate(BaseModel):
+    tasks: List[Dict[str, Any]]
+
+class TaskBatchCreateResult(BaseModel):
+    # "index" is the item's position in the request, as for errors
+    created: List[BatchItemCreated] = []
+    errors: List[BatchItemError] = []
+
+class TaskBatchUpdate(BaseModel):
+    # which tasks: explicit ids and/or their current status/priority
+    ids: Optional[List[int]] = None
+    where_status: OptionalStatus = None
+    where_priority: OptionalPriority = None
+    # new values
+    status: OptionalStatus = None
+    priority: OptionalPriority = None
+
+class TaskBatchUpdateResult(BaseModel):
+    updated: List[TaskOut] = []
+    missing_ids: List[int] = []
+
+class TaskBatchDeleteResult(BaseModel):
+    deleted_ids: List[int] = []
+    missing_ids: List[int] = []
+
+class RejectedRow(BaseModel):
+    line: int
+    errors: Any
+
+class TaskImportReport(BaseModel):
+    processed: int
+    imported: int
+    rejected_count: int
+    rejected: List[RejectedRow] = []
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from datetime import datetime 
+from datetime import date, datetime 
 from pydantic import EmailStr
-from typing import Optional 
+from typing import Dict, List, Optional 
 
 
 class UserBase(BaseModel):
@@ -33,4 +33,30 @@ class Token(BaseModel):
     token_type :str
 
 class TokenData(BaseModel):
-    id :Optional[str] = None            
\ No newline at end of file
+    id :Optional[str] = None
+
+class Principal(BaseModel):
+    id :int
+    name :Optional[str] = None
+    email :Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StatsBucket(BaseModel):
+    start : date
+    created : int = 0
+    completed : int = 0
+
+class UserStats(BaseModel):
+    total : int = 0
+    completed : int = 0
+    completion_rate : float = 0.0
+    # open tasks past their due date, as of the request
+    overdue : int = 0
+    by_status : Dict[str, int] = {}
+    by_priority : Dict[str, int] = {}
+    # tasks created and completed per bucket ("day", "week" or "month"), oldest first
+    bucket : str = "day"
+    trend : List[StatsBucket] = []
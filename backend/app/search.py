@@ -0,0 +1,232 @@
+"""Pluggable full-text search for tasks and boards.
+
+`PostgresSearch` matches against the ``search_vector`` tsvector columns
+(generated columns with GIN indexes, see migration 3b9e1c52f7a4) and ranks and
+highlights on the server. `MemorySearch` keeps a small inverted index per board
+(and per board owner) in process, so SQLite test runs search without
+``LIKE '%...%'`` scans. `LikeSearch` is the old substring behaviour.
+
+Highlights are HTML: the task text is escaped and only the ``<b>`` markers
+around matches are markup.
+"""
+import html
+import re
+import threading
+
+from sqlalchemy import func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from . import models
+from .cache import TTLCache
+from .config import settings
+
+HIGHLIGHT_START = "<b>"
+HIGHLIGHT_STOP = "</b>"
+# what ts_headline marks matches with, swapped for the tags after escaping
+_START_MARK = "\x02"
+_STOP_MARK = "\x03"
+
+_token_re = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str):
+    return [token.lower() for token in _token_re.findall(text or "")]
+
+
+class LikeSearch:
+    name = "like"
+
+    def filter_tasks(self, db: Session, query, board_id: int, text: str):
+        return query.where(models.Task.title.contains(text) | models.Task.description.contains(text))
+
+    def filter_boards(self, db: Session, query, owner_id: int, text: str):
+        return query.where(models.Board.title.contains(text))
+
+    def search_tasks(self, db: Session, query, board_id: int, text: str, limit: int):
+        tasks = db.scalars(self.filter_tasks(db, query, board_id, text).limit(limit)).all()
+        return [(task, 0.0, highlight(f"{task.title} {task.description}", tokenize(text))) for task in tasks]
+
+    def invalidate_board(self, board_id: int):
+        pass
+
+    def invalidate_owner(self, owner_id: int):
+        pass
+
+
+class PostgresSearch(LikeSearch):
+    name = "postgres"
+    config = "english"
+
+    def _config(self):
+        return literal(self.config, REGCONFIG)
+
+    def _tsquery(self, text: str):
+        return func.websearch_to_tsquery(self._config(), text)
+
+    def filter_tasks(self, db: Session, query, board_id: int, text: str):
+        return query.where(literal_column("tasks.search_vector").op("@@")(self._tsquery(text)))
+
+    def filter_boards(self, db: Session, query, owner_id: int, text: str):
+        return query.where(literal_column("boards.search_vector").op("@@")(self._tsquery(text)))
+
+    def search_tasks(self, db: Session, query, board_id: int, text: str, limit: int):
+        tsquery = self._tsquery(text)
+        rank = func.ts_rank_cd(literal_column("tasks.search_vector"), tsquery)
+        headline = func.ts_headline(
+            self._config(),
+            func.translate(models.Task.title + " " + models.Task.description, _START_MARK + _STOP_MARK, ""),
+            tsquery,
+            f"StartSel={_START_MARK}, StopSel={_STOP_MARK}, MaxFragments=2, MinWords=5, MaxWords=20",
+        )
+        rows = db.execute(
+            self.filter_tasks(db, query, board_id, text)
+            .add_columns(rank.label("rank"), headline.label("highlight"))
+            .order_by(rank.desc(), models.Task.id.desc())
+            .limit(limit)
+        ).all()
+        return [(row[0], float(row.rank), _marked_up(row.highlight)) for row in rows]
+
+
+class InvertedIndex:
+    """token -> {doc_id: term frequency}, plus the raw text for highlighting."""
+
+    def __init__(self, docs):
+        self.postings = {}
+        self.lengths = {}
+        self.texts = {}
+        for doc_id, text in docs:
+            tokens = tokenize(text)
+            self.texts[doc_id] = text
+            self.lengths[doc_id] = len(tokens) or 1
+            for token in tokens:
+                postings = self.postings.setdefault(token, {})
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def search(self, text: str):
+        """Documents containing every query token, best match first."""
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        scores = None
+        for token in tokens:
+            postings = self.postings.get(token, {})
+            if scores is None:
+                scores = {doc_id: tf / self.lengths[doc_id] for doc_id, tf in postings.items()}
+            else:
+                scores = {doc_id: score + postings[doc_id] / self.lengths[doc_id]
+                          for doc_id, score in scores.items() if doc_id in postings}
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+class MemorySearch(LikeSearch):
+    name = "memory"
+
+    def __init__(self):
+        self._board_tasks = TTLCache(settings.search_cache_max_size, settings.search_cache_ttl_seconds)
+        self._owner_boards = TTLCache(settings.search_cache_max_size, settings.search_cache_ttl_seconds)
+        # key -> [generation, builds running], only while an index is being
+        # built: an invalidation meanwhile bumps the generation, so the index
+        # built from rows read before the write is not stored after it
+        self._board_builds = {}
+        self._owner_builds = {}
+        self._lock = threading.Lock()
+
+    def _cached_index(self, cache, builds, key, query):
+        with self._lock:
+            index = cache.get(key)
+            if index is not None:
+                return index
+            build = builds.setdefault(key, [0, 0])
+            build[1] += 1
+            generation = build[0]
+        try:
+            index = InvertedIndex((row.id, f"{row.title} {row.description}") for row in query())
+        finally:
+            with self._lock:
+                if index is not None and build[0] == generation:
+                    cache.set(key, index)
+                build[1] -= 1
+                if not build[1]:
+                    del builds[key]
+        return index
+
+    def _invalidate(self, cache, builds, key):
+        with self._lock:
+            if key in builds:
+                builds[key][0] += 1
+            cache.pop(key)
+
+    def _task_index(self, db: Session, board_id: int):
+        return self._cached_index(self._board_tasks, self._board_builds, board_id, lambda: db.execute(
+            select(models.Task.id, models.Task.title, models.Task.description)
+            .where(models.Task.board_id == board_id)
+        ).all())
+
+    def _board_index(self, db: Session, owner_id: int):
+        return self._cached_index(self._owner_boards, self._owner_builds, owner_id, lambda: db.execute(
+            select(models.Board.id, models.Board.title, models.Board.description)
+            .where(models.Board.owner_id == owner_id, models.Board.deleted_at.is_(None))
+        ).all())
+
+    def filter_tasks(self, db: Session, query, board_id: int, text: str):
+        ids = [doc_id for doc_id, _ in self._task_index(db, board_id).search(text)]
+        return query.where(models.Task.id.in_(ids))
+
+    def filter_boards(self, db: Session, query, owner_id: int, text: str):
+        ids = [doc_id for doc_id, _ in self._board_index(db, owner_id).search(text)]
+        return query.where(models.Board.id.in_(ids))
+
+    def search_tasks(self, db: Session, query, board_id: int, text: str, limit: int):
+        index = self._task_index(db, board_id)
+        ranked = index.search(text)[:limit]
+        tasks = {task.id: task for task in db.scalars(query.where(models.Task.id.in_([doc_id for doc_id, _ in ranked])))}
+        tokens = tokenize(text)
+        return [(tasks[doc_id], score, highlight(index.texts[doc_id], tokens))
+                for doc_id, score in ranked if doc_id in tasks]
+
+    def invalidate_board(self, board_id: int):
+        self._invalidate(self._board_tasks, self._board_builds, board_id)
+
+    def invalidate_owner(self, owner_id: int):
+        self._invalidate(self._owner_boards, self._owner_builds, owner_id)
+
+
+def highlight(text: str, tokens):
+    """HTML-escape `text` and wrap every occurrence of a query token in <b>...</b>, like ts_headline does."""
+    wanted = set(tokens)
+    return _marked_up(_token_re.sub(
+        lambda match: f"{_START_MARK}{match.group(0)}{_STOP_MARK}" if match.group(0).lower() in wanted else match.group(0),
+        (text or "").replace(_START_MARK, "").replace(_STOP_MARK, ""),
+    ))
+
+
+def _marked_up(marked: str):
+    """Escaped HTML of text whose matches are between _START_MARK and _STOP_MARK."""
+    return html.escape(marked or "").replace(_START_MARK, HIGHLIGHT_START).replace(_STOP_MARK, HIGHLIGHT_STOP)
+
+
+_backends = {
+    "like": LikeSearch(),
+    "postgres": PostgresSearch(),
+    "memory": MemorySearch(),
+}
+
+
+def get_backend(db: Session):
+    name = settings.search_backend
+    if name == "auto":
+        name = "postgres" if db.get_bind().dialect.name == "postgresql" else "memory"
+    return _backends[name]
+
+
+def invalidate_board(board_id: int):
+    """Drop cached index data after a board's tasks changed."""
+    for backend in _backends.values():
+        backend.invalidate_board(board_id)
+
+
+def invalidate_owner(owner_id: int):
+    """Drop cached index data after an owner's boards changed."""
+    for backend in _backends.values():
+        backend.invalidate_owner(owner_id)
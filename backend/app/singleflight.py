@@ -0,0 +1,112 @@
+"""Single-flight coalescing of identical authenticated GETs (COALESCE_GETS).
+
+The dashboard fetches every board's tasks at once, and a client that reloads
+or retries sends the same GET again while the first is still running. With
+coalescing the first request (the leader) runs as usual; identical requests
+arriving before it finishes wait for it and replay its response, so they
+share one database query and one serialized body.
+
+"Identical" is the method, path, query string and every header the response
+depends on: Authorization (responses are per user), X-DB-Primary-Until
+(read routing), Accept and the conditional headers. Nothing is cached past the leader's
+response, and a successful write by a client ends its flights, so a read
+sent after a write never gets an answer computed before it.
+
+Only whole, small responses are shared: a stream (``text/event-stream``) or
+a body over COALESCE_MAX_BODY_BYTES releases the waiting requests to run on
+their own, as does a leader that fails without answering.
+"""
+import asyncio
+
+from . import metrics
+from .config import settings
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+KEY_HEADERS = (b"authorization", b"x-db-primary-until", b"accept", b"if-none-match", b"if-modified-since")
+
+coalesced = metrics.Counter("coalesced_requests_total", "GET requests answered with another request's response")
+
+
+class Flight:
+    def __init__(self):
+        self.messages = []
+        self.size = 0
+        self.complete = False
+        self.done = asyncio.Event()
+
+
+# request key -> the flight answering it
+_flights = {}
+
+
+def _key(scope):
+    headers = dict(scope.get("headers", ()))
+    if b"authorization" not in headers:
+        return None
+    return (scope["path"], scope.get("query_string", b""), *(headers.get(name) for name in KEY_HEADERS))
+
+
+def _land(key, flight):
+    if _flights.get(key) is flight:
+        del _flights[key]
+    flight.done.set()
+
+
+class CoalescingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.coalesce_gets:
+            return await self.app(scope, receive, send)
+        if scope["method"] in WRITE_METHODS:
+            return await self._write(scope, receive, send)
+        key = _key(scope) if scope["method"] == "GET" else None
+        if key is None:
+            return await self.app(scope, receive, send)
+
+        flight = _flights.get(key)
+        if flight is not None:
+            await flight.done.wait()
+            if flight.complete:
+                coalesced.inc()
+                for message in flight.messages:
+                    await send(message)
+                return
+            return await self.app(scope, receive, send)
+
+        flight = _flights[key] = Flight()
+
+        async def send_recording(message):
+            if not flight.done.is_set():
+                if message["type"] == "http.response.start":
+                    content_type = dict(message.get("headers", ())).get(b"content-type", b"")
+                    if content_type.startswith(b"text/event-stream"):
+                        _land(key, flight)
+                else:
+                    flight.size += len(message.get("body", b""))
+                    if flight.size > settings.coalesce_max_body_bytes:
+                        _land(key, flight)
+                if not flight.done.is_set():
+                    flight.messages.append(message)
+                    if message["type"] == "http.response.body" and not message.get("more_body", False):
+                        flight.complete = True
+                        _land(key, flight)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_recording)
+        finally:
+            _land(key, flight)
+
+    async def _write(self, scope, receive, send):
+        authorization = dict(scope.get("headers", ())).get(b"authorization")
+
+        async def send_ending_flights(message):
+            # the write is committed by the time its response starts
+            if message["type"] == "http.response.start" and message["status"] < 400 and authorization:
+                for key in [key for key in _flights if key[2] == authorization]:
+                    del _flights[key]
+            await send(message)
+
+        await self.app(scope, receive, send_ending_flights)
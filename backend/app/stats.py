@@ -0,0 +1,225 @@
+"""Per-user task statistics (GET /users/me/stats), maintained incrementally.
+
+Counting a user's tasks on every request means reading all of them. Instead
+every task write records what it changed (`Changes`) and `apply` adds that
+to the user's ``user_stats`` row and today's ``user_stats_daily`` row in the
+same transaction. Task writes already lock the user's row first
+(`crud.next_change_seq`), so the read-modify-write is race free and the
+counters are exactly as committed. The row is created with the user.
+
+Overdue is the one figure that changes with the clock alone, so it is not a
+counter: it is counted at read time from the open-tasks-by-due-date index of
+each of the user's boards (``ix_tasks_board_id_open_due_date``), which only
+holds tasks that aren't done. A read is the counters row, that count and a
+short range of daily rows.
+
+Users without a row (bulk loads that bypass `crud.create_user`) have their
+counters computed on read, without writing - GETs may run on a read
+replica - and the row is created by their next task write (`rebuild`).
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .enums import TaskPriority, TaskStatus
+
+# task columns the counters depend on; other updates leave them alone
+FIELDS = {"status", "priority"}
+
+_stats = models.UserStats.__table__
+
+
+class Changes:
+    """What one write did to a user's tasks."""
+
+    def __init__(self):
+        # (status, priority) -> change in the number of such tasks
+        self.tasks = Counter()
+        self.created = 0
+        self.completed = 0
+
+    @staticmethod
+    def _shape(status, priority):
+        return TaskStatus.parse(status), TaskPriority.parse(priority)
+
+    def add(self, status, priority):
+        shape = self._shape(status, priority)
+        self.tasks[shape] += 1
+        self.created += 1
+        if shape[0] is TaskStatus.done:
+            self.completed += 1
+
+    def remove(self, status, priority, count: int = 1):
+        self.tasks[self._shape(status, priority)] -= count
+
+    def update(self, old, new):
+        """`old` and `new` have status and priority (rows, tasks)."""
+        before = self._shape(old.status, old.priority)
+        after = self._shape(new.status, new.priority)
+        self.tasks[before] -= 1
+        self.tasks[after] += 1
+        if before[0] is not TaskStatus.done and after[0] is TaskStatus.done:
+            self.completed += 1
+
+
+def _deltas(changes: Changes):
+    deltas = Counter()
+    for (status, priority), count in changes.tasks.items():
+        deltas[f"status_{status.name}"] += count
+        deltas[f"priority_{priority.name}"] += count
+    return {name: count for name, count in deltas.items() if count}
+
+
+def apply(db: Session, user_id: int, changes: Changes):
+    """Add `changes` to `user_id`'s counters in the current transaction.
+
+    Call after the task statements (and `crud.next_change_seq`), before commit.
+    """
+    deltas = _deltas(changes)
+    if deltas:
+        updated = db.execute(
+            update(_stats)
+            .where(_stats.c.user_id == user_id)
+            .values({_stats.c[name]: _stats.c[name] + count for name, count in deltas.items()})
+        ).rowcount
+        if not updated:
+            # counted from the tasks, this write included
+            rebuild(db, user_id)
+
+    if changes.created or changes.completed:
+        daily = models.UserStatsDaily.__table__
+        day = datetime.now(timezone.utc).date()
+        updated = db.execute(
+            update(daily)
+            .where(daily.c.user_id == user_id, daily.c.day == day)
+            .values(created=daily.c.created + changes.created, completed=daily.c.completed + changes.completed)
+        ).rowcount
+        if not updated:
+            db.execute(insert(daily).values(user_id=user_id, day=day, created=changes.created,
+                                            completed=changes.completed))
+
+
+def record(db: Session, user_id: int, created=(), deleted=(), updated=()):
+    """`apply` for tasks (or rows with status and priority) that were created
+    or deleted, and (old, new) pairs that were updated."""
+    changes = Changes()
+    for task in created:
+        changes.add(task.status, task.priority)
+    for task in deleted:
+        changes.remove(task.status, task.priority)
+    for old, new in updated:
+        changes.update(old, new)
+    apply(db, user_id, changes)
+
+
+def board_changes(db: Session, board_id: int):
+    """Changes removing all of `board_id`'s tasks (one GROUP BY on the board's index)."""
+    changes = Changes()
+    for row in db.execute(
+        select(models.Task.status, models.Task.priority, func.count().label("task_count"))
+        .where(models.Task.board_id == board_id)
+        .group_by(models.Task.status, models.Task.priority)
+    ):
+        changes.remove(row.status, row.priority, row.task_count)
+    return changes
+
+
+def counts(db: Session, user_id: int):
+    """`user_stats` values for `user_id`, counted from the tasks themselves."""
+    rows = db.execute(
+        select(models.Task.status, models.Task.priority, func.count().label("task_count"))
+        .join(models.Board, models.Board.id == models.Task.board_id)
+        .where(models.Board.owner_id == user_id, models.Board.deleted_at.is_(None))
+        .group_by(models.Task.status, models.Task.priority)
+    ).all()
+    values = Counter({f"status_{member.name}": 0 for member in TaskStatus})
+    values.update({f"priority_{member.name}": 0 for member in TaskPriority})
+    for row in rows:
+        values[f"status_{row.status.name}"] += row.task_count
+        values[f"priority_{row.priority.name}"] += row.task_count
+    return dict(values)
+
+
+def rebuild(db: Session, user_id: int):
+    """Create `user_id`'s counters row from their tasks, in the current (write)
+    transaction, unless another transaction has just done so."""
+    try:
+        with db.begin_nested():
+            db.execute(insert(_stats).values(user_id=user_id, **counts(db, user_id)))
+    except IntegrityError:
+        pass
+
+
+def overdue_count(db: Session, user_id: int, now: datetime = None):
+    """Open tasks past their due date, from each live board's open-tasks index."""
+    # due dates are naive local times, like everywhere else (crud.is_overdue)
+    return db.scalar(
+        select(func.count())
+        .select_from(models.Task)
+        .join(models.Board, models.Board.id == models.Task.board_id)
+        .where(
+            models.Board.owner_id == user_id,
+            models.Board.deleted_at.is_(None),
+            models.Task.status != TaskStatus.done,
+            models.Task.due_date < (now or datetime.now()),
+        )
+    )
+
+
+def _bucket_start(day: date, bucket: str):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, bucket: str):
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def user_stats(db: Session, user_id: int, bucket: str = "day", days: int = 30):
+    """Counters, overdue count and the created/completed trend over the last `days` days.
+
+    Read-only, so it can run on a read replica.
+    """
+    row = db.execute(select(_stats).where(_stats.c.user_id == user_id)).first()
+    values = row._mapping if row is not None else counts(db, user_id)
+
+    today = datetime.now(timezone.utc).date()
+    first = _bucket_start(today - timedelta(days=days - 1), bucket)
+    daily = models.UserStatsDaily
+    trend = {}
+    start = first
+    while start <= today:
+        trend[start] = {"start": start, "created": 0, "completed": 0}
+        start = _next_bucket(start, bucket)
+    for day in db.execute(
+        select(daily.day, daily.created, daily.completed)
+        .where(daily.user_id == user_id, daily.day >= first)
+    ):
+        point = trend[_bucket_start(day.day, bucket)]
+        point["created"] += day.created
+        point["completed"] += day.completed
+
+    by_status = {member.value: values[f"status_{member.name}"] for member in TaskStatus}
+    total = sum(by_status.values())
+    completed = by_status[TaskStatus.done.value]
+    return {
+        "total": total,
+        "completed": completed,
+        "completion_rate": completed / total if total else 0.0,
+        "overdue": overdue_count(db, user_id),
+        "by_status": by_status,
+        "by_priority": {member.value: values[f"priority_{member.name}"] for member in TaskPriority},
+        "bucket": bucket,
+        "trend": list(trend.values()),
+    }
@@ -0,0 +1,66 @@
+"""Retention of the tombstones GET /sync reports deletions from.
+
+A ``tombstone_purge`` job deletes tombstones older than
+TOMBSTONE_RETENTION_DAYS, PURGE_CHUNK_SIZE per run (one transaction each,
+committed with the rescheduled job), every TOMBSTONE_PURGE_INTERVAL_SECONDS
+or right away while a backlog remains. In the same transaction each owner's
+``users.tombstones_purged_seq`` is raised to the highest change sequence
+deleted: a sync token below it may have missed deletions, so GET /sync
+answers it with ``reset`` and the client starts over from ``since=0``.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from . import jobs, metrics, models
+from .config import settings
+
+KEY = "tombstone_purge"
+
+tombstones_purged = metrics.Counter("tombstones_purged_total", "Tombstones deleted after the retention period")
+
+
+def purge_chunk(db: Session, before: datetime, chunk_size: int):
+    """Delete up to `chunk_size` tombstones older than `before` (not committed); return how many."""
+    ids = (
+        select(models.Tombstone.id)
+        .where(models.Tombstone.deleted_at < before)
+        .order_by(models.Tombstone.deleted_at)
+        .limit(chunk_size)
+    )
+    rows = db.execute(
+        delete(models.Tombstone)
+        .where(models.Tombstone.id.in_(ids.scalar_subquery()))
+        .returning(models.Tombstone.owner_id, models.Tombstone.change_seq),
+        execution_options={"synchronize_session": False},
+    ).all()
+
+    purged = {}
+    for row in rows:
+        purged[row.owner_id] = max(purged.get(row.owner_id, 0), row.change_seq)
+    # in id order, so two purges never wait on each other's user rows
+    for owner_id in sorted(purged):
+        db.execute(
+            update(models.User)
+            .where(models.User.id == owner_id, models.User.tombstones_purged_seq < purged[owner_id])
+            .values(tombstones_purged_seq=purged[owner_id])
+            .execution_options(synchronize_session=False)
+        )
+    tombstones_purged.inc(len(rows))
+    return len(rows)
+
+
+@jobs.handler(KEY)
+def purge(db: Session, job):
+    before = datetime.now(timezone.utc) - timedelta(days=settings.tombstone_retention_days)
+    deleted = purge_chunk(db, before, settings.purge_chunk_size)
+    full = deleted == settings.purge_chunk_size
+    return jobs.Repeat(0 if full else settings.tombstone_purge_interval_seconds)
+
+
+def ensure_scheduled(db: Session):
+    """Queue the purge unless it already is (or tombstones are kept forever)."""
+    if settings.tombstone_retention_days > 0 and settings.tombstone_purge_interval_seconds > 0:
+        jobs.enqueue(db, KEY, key=KEY)
+        db.commit()
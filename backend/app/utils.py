@@ -1,10 +1,60 @@
-from passlib.context import CryptContext    
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from .config import settings
+from . import instrumentation
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated = "auto")
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated = "auto", bcrypt__rounds = settings.bcrypt_rounds)
 
 def hash(password :str):
     return pwd_context.hash(password)
 
 def verify(plain_password , hashed_password):
     return pwd_context.verify(  plain_password , hashed_password)
+
+def verify_and_update(plain_password , hashed_password):
+    """(is_valid, new_hash) - new_hash is set when the stored hash uses outdated settings."""
+    return pwd_context.verify_and_update(plain_password , hashed_password)
+
+
+# bcrypt is deliberately slow; run it on a dedicated, bounded pool so a burst of
+# logins queues here (and is shed with 429) instead of starving the request threadpool
+_executor = None
+_in_flight = 0
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        if settings.password_executor == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.password_workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.password_workers, thread_name_prefix="password")
+    return _executor
+
+
+async def _run_password_job(fn, *args):
+    global _in_flight
+    if _in_flight >= settings.password_workers + settings.password_queue_size:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    _in_flight += 1
+    try:
+        # includes the wait for a free worker
+        with instrumentation.span("bcrypt"):
+            return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _in_flight -= 1
+
+
+async def hash_async(password :str):
+    return await _run_password_job(hash, password)
+
+async def verify_and_update_async(plain_password , hashed_password):
+    return await _run_password_job(verify_and_update, plain_password, hashed_password)
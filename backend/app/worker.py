@@ -0,0 +1,53 @@
+"""Job worker process (see app/jobs.py)::
+
+    python -m app.worker [--concurrency N] [--poll-interval SECONDS]
+
+Runs until SIGINT/SIGTERM, then finishes the jobs in hand. Run as many as
+needed, on any host; set JOB_INLINE_WORKERS=0 on the API processes to keep
+job work out of them entirely.
+"""
+import argparse
+import logging
+import signal
+import sys
+import threading
+
+from . import jobs, reminders, purge, tombstones  # noqa: F401 - register their handlers
+from .config import settings
+
+
+def start(concurrency: int, poll_interval: float = None):
+    """Start a worker (threads in this process) and make sure the periodic jobs are queued."""
+    from .database import Sessionlocal
+
+    with Sessionlocal() as db:
+        reminders.ensure_scheduled(db)
+        tombstones.ensure_scheduled(db)
+    worker = jobs.Worker(concurrency, poll_interval)
+    worker.start()
+    return worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run queued jobs")
+    parser.add_argument("--concurrency", type=int, default=settings.job_worker_concurrency,
+                        help="jobs run at the same time (threads)")
+    parser.add_argument("--poll-interval", type=float, default=settings.job_poll_seconds,
+                        help="seconds to wait when no job is due")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(levelname)s %(message)s")
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    worker = start(args.concurrency, args.poll_interval)
+    logging.info("worker running %s job threads", args.concurrency)
+    stopping.wait()
+    logging.info("stopping, waiting for running jobs")
+    worker.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
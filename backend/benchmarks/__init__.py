@@ -0,0 +1,46 @@
+"""Load tests and micro-benchmarks for the API (run from backend/).
+
+Seed a throwaway database and drive the real app, in-process over httpx's
+ASGI transport or through uvicorn::
+
+    python -m benchmarks.load --database-url sqlite:///bench.db --seed \\
+        --users 20 --boards 5 --tasks 200 --transport asgi --out base.json
+
+    python -m benchmarks.micro --out micro.json
+
+Results are JSON. Compare two runs, e.g. before and after a change, and fail
+on regressions::
+
+    python -m benchmarks.compare base.json head.json --max-regression 0.15
+
+Settings come from the environment as usual, so e.g. ``FAST_JSON=true`` in
+front of the load command benchmarks that mode against the default one.
+
+Postgres works the same way with a postgresql:// URL; the schema is created
+with the alembic migrations there. --reset wipes the target database, so
+point it at a dedicated one.
+"""
+import os
+
+# Settings() requires these; a benchmark run doesn't care about their values
+REQUIRED_SETTINGS = {
+    "DATABASE_USERNAME": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "DATABASE_HOSTNAME": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_NAME": "bench",
+    "SECRET_KEY": "benchmark-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+}
+
+
+def configure(database_url: str = None, **settings):
+    """Point the app at `database_url`; must run before anything imports `app`."""
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    for name, value in REQUIRED_SETTINGS.items():
+        os.environ.setdefault(name, value)
+    for name, value in settings.items():
+        os.environ[name.upper()] = str(value)
+    return dict(os.environ)
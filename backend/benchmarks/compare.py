@@ -0,0 +1,85 @@
+"""Compare two benchmark reports and fail on regressions.
+
+    python -m benchmarks.compare baseline.json current.json --max-regression 0.15
+
+Latency and throughput changes beyond --max-regression (relative) count as
+regressions; so does any increase in queries per request beyond
+--max-query-increase (absolute), since those are deterministic and usually
+mean an N+1. Exits 1 if anything regressed.
+"""
+import argparse
+import json
+import sys
+
+# metric -> True when lower is better
+METRICS = {
+    "p50_ms": True,
+    "p99_ms": True,
+    "ns_per_op": True,
+    "throughput_rps": False,
+    "ops_per_sec": False,
+    "queries_per_request": True,
+}
+
+
+def _rows(report):
+    """(name, metrics) for every scenario and per-request breakdown."""
+    for scenario, result in report["scenarios"].items():
+        yield scenario, result
+        for route, sub in result.get("requests", {}).items():
+            yield f"{scenario} {route}", sub
+
+
+def compare(baseline, current, max_regression, max_query_increase):
+    old = dict(_rows(baseline))
+    rows, regressions = [], []
+    for name, new_metrics in _rows(current):
+        if name not in old:
+            continue
+        for metric, lower_is_better in METRICS.items():
+            before, after = old[name].get(metric), new_metrics.get(metric)
+            if before is None or after is None:
+                continue
+            if metric == "queries_per_request":
+                regressed = after - before > max_query_increase
+            elif metric == "throughput_rps" and " " in name:
+                # per-request throughput just mirrors the scenario's
+                continue
+            else:
+                worse = (after - before) if lower_is_better else (before - after)
+                regressed = before > 0 and worse / before > max_regression
+            change = (after - before) / before if before else 0.0
+            rows.append((name, metric, before, after, change, regressed))
+            if regressed:
+                regressions.append((name, metric))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="tolerated relative slowdown of latency/throughput")
+    parser.add_argument("--max-query-increase", type=float, default=0.0,
+                        help="tolerated increase of queries per request")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows, regressions = compare(baseline, current, args.max_regression, args.max_query_increase)
+    width = max((len(row[0]) for row in rows), default=10)
+    for name, metric, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<{width}}  {metric:<20} {before:>12.2f} -> {after:>12.2f}  {change:+7.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Closed-loop load test of the main API flows.
+
+Each scenario runs `--concurrency` workers that issue requests back to back
+until `--requests` have completed, as seeded users chosen round-robin. The
+app is driven in-process through httpx's ASGI transport (no network, good
+for comparing code changes) or through a uvicorn subprocess (real server,
+``--workers`` processes).
+
+Per scenario and per request the report has p50/p90/p99/mean latency,
+throughput and SQL statements per request (read from the Server-Timing
+header), as JSON for `benchmarks.compare`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import count
+
+from . import configure, seed as seeding
+
+QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+SCENARIOS = ("login", "list_boards", "dashboard", "user_stats", "list_tasks", "search_tasks", "filter_tasks", "task_crud")
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = 0
+
+    async def call(self, client, name, method, url, **kwargs):
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.errors += 1
+        match = QUERIES.search(response.headers.get("server-timing", ""))
+        self.samples.setdefault(name, []).append((elapsed, int(match.group(1)) if match else None))
+        return response
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(samples, errors, wall):
+    latencies = [elapsed * 1000 for elapsed, _ in samples]
+    queries = [q for _, q in samples if q is not None]
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p90_ms": round(percentile(latencies, 0.90), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(len(samples) / wall, 1) if wall else None,
+        "queries_per_request": round(statistics.fmean(queries), 2) if queries else None,
+    }
+
+
+class Session:
+    """A logged-in seeded user."""
+
+    def __init__(self, email, user_id, token, board_ids):
+        self.email = email
+        self.user_id = user_id
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.board_ids = board_ids
+
+
+async def login(client, email):
+    response = await client.post("/login", data={"username": email, "password": seeding.PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def open_sessions(client, layout, limit):
+    from jose import jwt
+    sessions = []
+    for email, board_ids in list(layout.items())[:limit]:
+        token = await login(client, email)
+        # no unverified-claims call in the API: peek at the payload we just got
+        user_id = jwt.get_unverified_claims(token)["user_id"]
+        sessions.append(Session(email, user_id, token, board_ids))
+    return sessions
+
+
+# one coroutine per scenario iteration: `n` picks the user and board
+async def run_login(client, rec, sessions, n):
+    session = sessions[n % len(sessions)]
+    await rec.call(client, "POST /login", "POST", "/login",
+                   data={"username": session.email, "password": seeding.PASSWORD})
+
+
+async def run_list_boards(client, rec, sessions, n):
+    session = sessions[n % len(sessions)]
+    await rec.call(client, "GET /boards/", "GET", "/boards/", headers=session.headers)
+
+
+async def run_dashboard(client, rec, sessions, n):
+    session = sessions[n % len(sessions)]
+    await rec.call(client, "GET /users/{id}", "GET", f"/users/{session.user_id}", headers=session.headers)
+    await rec.call(client, "GET /boards/summary", "GET", "/boards/summary", headers=session.headers)
+
+
+async def run_user_stats(client, rec, sessions, n):
+    session = sessions[n % len(sessions)]
+    await rec.call(client, "GET /users/me/stats", "GET", "/users/me/stats", headers=session.headers)
+
+
+def _board(sessions, n):
+    session = sessions[n % len(sessions)]
+    return session, session.board_ids[n // len(sessions) % len(session.board_ids)]
+
+
+async def run_list_tasks(client, rec, sessions, n):
+    session, board_id = _board(sessions, n)
+    await rec.call(client, "GET /boards/{id}/tasks/", "GET", f"/boards/{board_id}/tasks/", headers=session.headers)
+
+
+async def run_search_tasks(client, rec, sessions, n):
+    session, board_id = _board(sessions, n)
+    term = seeding.WORDS[n % len(seeding.WORDS)]
+    await rec.call(client, "GET /boards/{id}/tasks/search", "GET", f"/boards/{board_id}/tasks/search",
+                   params={"q": term}, headers=session.headers)
+
+
+async def run_filter_tasks(client, rec, sessions, n):
+    session, board_id = _board(sessions, n)
+    await rec.call(client, "GET /boards/{id}/tasks/?status&sort", "GET", f"/boards/{board_id}/tasks/",
+                   params={"status": "todo,in progress", "sort": "priority,due_date"}, headers=session.headers)
+
+
+async def run_task_crud(client, rec, sessions, n):
+    session, board_id = _board(sessions, n)
+    base = f"/boards/{board_id}/tasks/"
+    created = await rec.call(client, "POST /boards/{id}/tasks/", "POST", base, headers=session.headers,
+                             json={"title": f"Load test task {n}", "priority": "High"})
+    if created.status_code != 201:
+        return
+    task_id = created.json()["id"]
+    await rec.call(client, "PUT /boards/{id}/tasks/{id}", "PUT", f"{base}{task_id}", headers=session.headers,
+                   json={"status": "Done"})
+    await rec.call(client, "DELETE /boards/{id}/tasks/{id}", "DELETE", f"{base}{task_id}", headers=session.headers)
+
+
+RUNNERS = {name: globals()[f"run_{name}"] for name in SCENARIOS}
+
+
+async def run_scenario(client, name, sessions, requests, concurrency, warmup):
+    runner = RUNNERS[name]
+    for n in range(warmup):
+        await runner(client, Recorder(), sessions, n)
+
+    rec = Recorder()
+    counter = count()
+
+    async def worker():
+        while (n := next(counter)) < requests:
+            await runner(client, rec, sessions, n)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    everything = [sample for samples in rec.samples.values() for sample in samples]
+    result = summarize(everything, rec.errors, wall)
+    result["iterations"] = requests
+    result["requests"] = {route: summarize(samples, 0, wall) for route, samples in rec.samples.items()}
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def board_layout(users):
+    """{email: [board ids]} of the first `users` seeded users, read back from the database."""
+    from sqlalchemy import select
+
+    from app import models
+    from app.database import Sessionlocal
+
+    emails = [seeding.email(i) for i in range(users)]
+    with Sessionlocal() as db:
+        rows = db.execute(
+            select(models.User.email, models.Board.id)
+            .join(models.Board, models.Board.owner_id == models.User.id)
+            .where(models.User.email.in_(emails))
+            .order_by(models.Board.id)
+        ).all()
+    layout = {}
+    for email, board_id in rows:
+        layout.setdefault(email, []).append(board_id)
+    if not layout:
+        raise SystemExit("no seeded users found; run with --seed (and --reset) first")
+    return layout
+
+
+class UvicornServer:
+    def __init__(self, port, workers):
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+                        "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+        self.process = None
+
+    async def __aenter__(self):
+        import httpx
+        self.process = subprocess.Popen(self.command, env=os.environ.copy())
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            for _ in range(200):
+                if self.process.poll() is not None:
+                    raise SystemExit("uvicorn exited during startup")
+                try:
+                    await client.get("/")
+                    return self
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+        raise SystemExit("uvicorn didn't start within 10s")
+
+    async def __aexit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+async def run(args, layout):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.transport == "uvicorn":
+        server = UvicornServer(args.port, args.workers)
+        await server.__aenter__()
+        client = httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=60)
+    else:
+        from app.main import app
+        server = None
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    try:
+        sessions = await open_sessions(client, layout, args.concurrency * 4)
+        results = {}
+        for name in args.scenarios:
+            # bcrypt makes logins orders of magnitude slower than everything else
+            requests = max(1, args.requests // 10) if name == "login" else args.requests
+            results[name] = await run_scenario(client, name, sessions, requests, args.concurrency, args.warmup)
+            print(f"{name:>14}: p50 {results[name]['p50_ms']:8.2f} ms  p99 {results[name]['p99_ms']:8.2f} ms  "
+                  f"{results[name]['throughput_rps']:8.1f} req/s  {results[name]['queries_per_request']} queries/req",
+                  file=sys.stderr)
+        return results
+    finally:
+        await client.aclose()
+        if server is not None:
+            await server.__aexit__(None, None, None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API")
+    seeding.add_arguments(parser)
+    parser.add_argument("--seed", action="store_true", help="create and seed the database before running")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="iterations per scenario (a tenth for login)")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    configure(args.database_url)
+    if args.seed:
+        seeding.prepare(args)
+    layout = board_layout(args.users)
+
+    results = asyncio.run(run(args, layout))
+    report = {
+        "meta": {
+            "kind": "load",
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "database": args.database_url.split(":", 1)[0],
+            "transport": args.transport,
+            "workers": args.workers if args.transport == "uvicorn" else None,
+            "concurrency": args.concurrency,
+            "data": {"users": args.users, "boards_per_user": args.boards, "tasks_per_board": args.tasks,
+                     "random_seed": args.random_seed},
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Micro-benchmarks of the hot paths that don't need a database server.
+
+    python -m benchmarks.micro --out micro.json [--filter serialize]
+
+Each benchmark is timed with timeit (best of --repeat runs) and reported as
+ns_per_op / ops_per_sec in the same JSON layout as `benchmarks.load`.
+``*_fast`` variants run the FAST_JSON path (app/serialization.py) next to the
+default one; they are skipped when orjson isn't installed.
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from . import configure
+
+BENCHMARKS = {}
+
+
+def benchmark(number):
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, number)
+        return setup
+    return register
+
+
+def _tasks(n):
+    from app.enums import TaskPriority, TaskStatus
+    now = datetime.now(timezone.utc)
+    return [
+        {"id": i, "title": f"Task {i}", "description": "Write the quarterly report " * 3,
+         "status": list(TaskStatus)[i % 3], "priority": list(TaskPriority)[i % 3],
+         "due_date": now + timedelta(days=i), "created_at": now, "board_id": 1}
+        for i in range(n)
+    ]
+
+
+def _task_db(n):
+    """Session on an in-memory SQLite database with one board of `n` tasks."""
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+
+    from app import models
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(insert(models.User), [{"name": "Bench", "email": "bench@example.com", "password": "-"}])
+        db.execute(insert(models.Board), [{"title": "Board", "description": "Benchmark board", "owner_id": 1}])
+        db.execute(insert(models.Task), _tasks(n))
+        db.commit()
+    return Session(engine)
+
+
+def _fast_available():
+    from app import serialization
+    return serialization.orjson is not None
+
+
+# each function returns the zero-argument callable to time (None: skip)
+@benchmark(number=200)
+def serialize_tasks_100():
+    from app import httpcache
+    from app.schemas.task import TaskOut
+    tasks = _tasks(100)
+    return lambda: httpcache.serialize(list[TaskOut], tasks)
+
+
+@benchmark(number=200)
+def serialize_tasks_100_fast():
+    from app import httpcache
+    from app.schemas.task import TaskOut
+    tasks = _tasks(100)
+    return (lambda: httpcache.serialize(list[TaskOut], tasks, projected=True)) if _fast_available() else None
+
+
+# the body of GET /boards/{id}/tasks/?limit=500: query, load, serialize
+@benchmark(number=30)
+def list_tasks_500():
+    from app import crud, httpcache
+    from app.schemas.task import TaskOut
+    db = _task_db(500)
+
+    def run():
+        body = httpcache.serialize(list[TaskOut], crud.list_tasks(db, 1, 1, limit=500))
+        db.close()
+        return body
+    return run
+
+
+@benchmark(number=30)
+def list_tasks_500_fast():
+    from app import crud, httpcache
+    from app.schemas.task import TaskOut
+    if not _fast_available():
+        return None
+    db = _task_db(500)
+
+    def run():
+        body = httpcache.serialize(list[TaskOut], crud.list_tasks(db, 1, 1, limit=500, project=True), projected=True)
+        db.close()
+        return body
+    return run
+
+
+@benchmark(number=20000)
+def cursor_roundtrip():
+    from app import pagination
+    now = datetime.now(timezone.utc)
+    return lambda: pagination.decode_cursor(pagination.encode_cursor(now, 12345))
+
+
+@benchmark(number=100000)
+def ttlcache_get_set():
+    from app.cache import TTLCache
+    cache = TTLCache(maxsize=1024, ttl=60)
+    keys = [f"key-{i}" for i in range(2048)]
+    position = iter(range(10 ** 12))
+
+    def run():
+        key = keys[next(position) % 2048]
+        if cache.get(key) is None:
+            cache.set(key, key)
+    return run
+
+
+@benchmark(number=100000)
+def enum_parse():
+    from app.enums import TaskStatus
+    return lambda: TaskStatus.parse("in progress")
+
+
+@benchmark(number=5000)
+def jwt_verify():
+    from fastapi import HTTPException
+
+    import app.schemas.user  # noqa: F401 - loaded by the routers in the app
+    from app import Oauth2
+    token = Oauth2.create_access_token({"user_id": 1})
+    error = HTTPException(status_code=401)
+    return lambda: Oauth2.verify_access_token(token, error)
+
+
+@benchmark(number=3)
+def bcrypt_verify():
+    from app import utils
+    hashed = utils.hash("bench-password")
+    return lambda: utils.verify("bench-password", hashed)
+
+
+def run(names, repeat):
+    results = {}
+    for name in names:
+        setup, number = BENCHMARKS[name]
+        fn = setup()
+        if fn is None:
+            print(f"{name:>24}: skipped", file=sys.stderr)
+            continue
+        fn()
+        best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+        results[name] = {"ns_per_op": round(best * 1e9, 1), "ops_per_sec": round(1 / best, 1), "number": number}
+        print(f"{name:>24}: {best * 1e6:10.2f} us/op", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run micro-benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    configure()
+    names = [name for name in BENCHMARKS if args.filter in name]
+    report = {
+        "meta": {
+            "kind": "micro",
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+        },
+        "scenarios": run(names, args.repeat),
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Create the schema and fill it with reproducible users, boards and tasks.
+
+    python -m benchmarks.seed --database-url sqlite:///bench.db --users 20 --boards 5 --tasks 200 --reset
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from . import configure
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "bench-password"
+
+WORDS = (
+    "api backend frontend release deploy review refactor bug feature design "
+    "database index query cache invoice report customer onboarding metrics "
+    "security audit migration docs sprint roadmap meeting budget hiring "
+    "mobile sync search export import billing email alert dashboard"
+).split()
+
+
+def email(user_index: int):
+    return f"bench{user_index}@example.com"
+
+
+def _sentence(rnd: random.Random, words: int):
+    return " ".join(rnd.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def reset(database_url: str):
+    """Drop everything in the target database (SQLite file or Postgres schema)."""
+    if database_url.startswith("sqlite"):
+        path = database_url.split("///", 1)[-1]
+        if path and path != ":memory:" and os.path.exists(path):
+            os.remove(path)
+        return
+    from sqlalchemy import create_engine
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP SCHEMA public CASCADE")
+        conn.exec_driver_sql("CREATE SCHEMA public")
+    engine.dispose()
+
+
+def create_schema(database_url: str):
+    if database_url.startswith("postgresql"):
+        # the migrations carry what the models don't map (search vectors)
+        from alembic import command
+        from alembic.config import Config
+        config = Config(str(BACKEND_DIR / "alembic.ini"))
+        config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+        command.upgrade(config, "head")
+    else:
+        from app import models
+        from app.database import engine
+        models.Base.metadata.create_all(engine)
+
+
+def seed(users: int, boards: int, tasks: int, seed: int = 42, chunk_size: int = 5000):
+    """Insert the data set and return {user email: [board ids]}."""
+    from sqlalchemy import insert, select
+
+    from app import models, stats, utils
+    from app.database import Sessionlocal
+    from app.enums import TaskPriority, TaskStatus
+
+    rnd = random.Random(seed)
+    now = datetime.now()
+    # one bcrypt hash for everyone: seeding shouldn't take minutes
+    password = utils.hash(PASSWORD)
+
+    with Sessionlocal() as db:
+        if db.scalar(select(models.User.id).limit(1)) is not None:
+            raise SystemExit("the database already has users; pass --reset to start over")
+
+        db.execute(insert(models.User), [
+            {"name": f"Bench User {i}", "email": email(i), "password": password} for i in range(users)
+        ])
+        user_ids = db.scalars(select(models.User.id).order_by(models.User.id)).all()
+
+        db.execute(insert(models.Board), [
+            {"title": _sentence(rnd, 2), "description": _sentence(rnd, 6), "owner_id": user_id}
+            for user_id in user_ids for _ in range(boards)
+        ])
+        board_rows = db.execute(select(models.Board.id, models.Board.owner_id).order_by(models.Board.id)).all()
+
+        rows = []
+        for board_id, _ in board_rows:
+            for _ in range(tasks):
+                due = now + timedelta(days=rnd.randint(-30, 60)) if rnd.random() < 0.7 else None
+                rows.append({
+                    "title": _sentence(rnd, rnd.randint(2, 5)),
+                    "description": _sentence(rnd, rnd.randint(5, 20)),
+                    "status": rnd.choice(list(TaskStatus)),
+                    "priority": rnd.choice(list(TaskPriority)),
+                    "due_date": due,
+                    "board_id": board_id,
+                })
+                if len(rows) >= chunk_size:
+                    db.execute(insert(models.Task), rows)
+                    rows = []
+        if rows:
+            db.execute(insert(models.Task), rows)
+        # the counters crud.create_user would have started, as of the tasks above
+        for user_id in user_ids:
+            stats.rebuild(db, user_id)
+        db.commit()
+
+    emails = {user_id: email(i) for i, user_id in enumerate(user_ids)}
+    layout = {address: [] for address in emails.values()}
+    for board_id, owner_id in board_rows:
+        layout[emails[owner_id]].append(board_id)
+    return layout
+
+
+def add_arguments(parser):
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--boards", type=int, default=5, help="boards per user")
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per board")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop all data in the target database first")
+
+
+def prepare(args):
+    """Reset/create/seed as requested by parsed `add_arguments` options."""
+    if args.reset:
+        reset(args.database_url)
+    configure(args.database_url)
+    create_schema(args.database_url)
+    started = time.perf_counter()
+    layout = seed(args.users, args.boards, args.tasks, seed=args.random_seed)
+    print(f"seeded {args.users} users, {args.users * args.boards} boards, "
+          f"{args.users * args.boards * args.tasks} tasks in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return layout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    add_arguments(parser)
+    prepare(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
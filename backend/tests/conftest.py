@@ -0,0 +1,45 @@
+"""Test setup, shared with the benchmarks (benchmarks.configure / benchmarks.seed).
+
+The suite runs on a throwaway SQLite file by default. Tests that need
+Postgres (COPY, EXPLAIN plans) are skipped unless TEST_POSTGRES_URL points at
+a scratch database - it is wiped and migrated at the start of the run::
+
+    TEST_POSTGRES_URL=postgresql://localhost/taskmanager_test python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# backend/ on the path, wherever pytest is started from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import configure  # noqa: E402
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+DATABASE_URL = POSTGRES_URL or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+# before anything imports app: the engine binds to DATABASE_URL on import
+configure(DATABASE_URL)
+
+requires_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="needs TEST_POSTGRES_URL")
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """A migrated database with seeded users, boards and tasks: {email: [board ids]}."""
+    from benchmarks import seed
+
+    seed.reset(DATABASE_URL)
+    seed.create_schema(DATABASE_URL)
+    return seed.seed(users=3, boards=4, tasks=300)
+
+
+@pytest.fixture
+def db(seeded):
+    from app.database import Sessionlocal
+
+    with Sessionlocal() as session:
+        yield session
@@ -0,0 +1,34 @@
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from app.enums import TaskPriority, TaskStatus
+from app.schemas.task import OptionalStatus, Priority, Status
+
+
+@pytest.mark.parametrize("value, member", [
+    ("In Progress", TaskStatus.in_progress),
+    ("  in progress ", TaskStatus.in_progress),
+    ("doing", TaskStatus.in_progress),
+    ("COMPLETED", TaskStatus.done),
+    ("pending", TaskStatus.todo),
+    (2, TaskStatus.done),
+    (TaskStatus.todo, TaskStatus.todo),
+])
+def test_parse_accepts_labels_aliases_and_codes(value, member):
+    assert TaskStatus.parse(value) is member
+
+
+@pytest.mark.parametrize("value", ["finished", "", True, 3])
+def test_parse_rejects_anything_else(value):
+    with pytest.raises(ValueError, match="must be one of: To Do, In Progress, Done"):
+        TaskStatus.parse(value)
+
+
+def test_lenient_fields_default_when_empty():
+    assert TypeAdapter(Status).validate_python("") is TaskStatus.todo
+    assert TypeAdapter(Priority).validate_python(None) is TaskPriority.medium
+    assert TypeAdapter(Priority).validate_python("high") is TaskPriority.high
+    assert TypeAdapter(OptionalStatus).validate_python("  ") is None
+    assert TypeAdapter(OptionalStatus).validate_python("closed") is TaskStatus.done
+    with pytest.raises(ValidationError):
+        TypeAdapter(Priority).validate_python("urgent")
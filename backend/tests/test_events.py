@@ -0,0 +1,61 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app import Oauth2, crud, events, models, reminders
+from app.schemas import user  # noqa: F401 - Oauth2 builds schemas.user.Principal
+
+
+async def _connected():
+    return False
+
+
+def test_connected_subscriber_receives_due_reminders(db):
+    user_id = crud.create_user(db, {"name": "due", "email": "due@example.com", "password": "x"}).id
+    board_id = crud.create_board(db, user_id, {"title": "b", "description": "d"}).id
+    task = crud.create_task(db, board_id, user_id, {"title": "t", "description": "d",
+                                                    "due_date": datetime.now() - timedelta(seconds=1)})
+    version = db.scalar(select(models.Board.version).where(models.Board.id == board_id))
+
+    async def receive():
+        # up to date: since == current version
+        stream = events.stream(board_id, version, version, _connected)
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        job = SimpleNamespace(payload={"after_due": (datetime.now() - timedelta(minutes=1)).isoformat()})
+        reminders.scan(db, job)
+        db.commit()
+        try:
+            return await asyncio.wait_for(stream.__anext__(), timeout=5)
+        finally:
+            await stream.aclose()
+
+    message = asyncio.run(receive())
+    assert message.startswith("event: task.due\n"), message
+    assert json.loads(message.split("data: ", 1)[1])["ids"] == [task.id]
+    # not replayed to clients resuming from an older version
+    assert all(event["type"] != "task.due" for event in events.broker.missed(board_id, version - 1, version))
+
+
+def test_stream_tokens_open_only_their_board(db):
+    user_id = crud.create_user(db, {"name": "stream", "email": "stream@example.com", "password": "x"}).id
+    stream_token = Oauth2.create_stream_token(user_id, 5)
+    access_token = Oauth2.create_access_token({"user_id": user_id})
+
+    def authenticate(board_id, **query):
+        query = {"token": None, "stream_token": None, "access_token": None, **query}
+        return asyncio.run(Oauth2.get_current_user_for_stream(board_id, db=db, **query))
+
+    assert authenticate(5, stream_token=stream_token).id == user_id
+    assert authenticate(5, token=access_token).id == user_id
+    for board_id, query in [(6, {"stream_token": stream_token}),
+                            (5, {"stream_token": access_token}),
+                            (5, {"token": stream_token}),
+                            # off by default: the access token would end up in logs
+                            (5, {"access_token": access_token})]:
+        with pytest.raises(HTTPException):
+            authenticate(board_id, **query)
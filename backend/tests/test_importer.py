@@ -0,0 +1,56 @@
+import csv
+import io
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app import importer, models
+from conftest import requires_postgres
+
+
+def _task(**values):
+    return {"title": "t", "description": "d", "status": "To Do", "priority": "High",
+            "due_date": None, "board_id": 1, "change_seq": 3, **values}
+
+
+def test_copy_buffer_writes_null_unquoted():
+    buffer = importer.copy_buffer([_task(), _task(title="", description="\\N")], postgresql.dialect())
+    lines = buffer.getvalue().splitlines()
+    assert lines[0] == '"t","d",0,2,\\N,1,3'
+    # empty and "\N" strings are quoted, so COPY reads them as text, not NULL
+    assert lines[1] == '"","\\N",0,2,\\N,1,3'
+    assert next(csv.reader(io.StringIO(lines[1])))[:2] == ["", "\\N"]
+
+
+@requires_postgres
+def test_import_without_due_date_through_copy(db, seeded):
+    board_id = next(iter(seeded.values()))[0]
+    source = io.BytesIO(b"title,description,status,due_date\nno due,,Done,\nwith due,x,,2030-01-02\n")
+    report = importer.import_tasks(db, board_id, source, "csv")
+    assert report["imported"] == 2 and report["rejected_count"] == 0
+    due = dict(db.execute(
+        select(models.Task.title, models.Task.due_date)
+        .where(models.Task.board_id == board_id, models.Task.title.in_(["no due", "with due"]))
+    ).all())
+    assert due["no due"] is None and due["with due"].year == 2030
+
+
+def _import_null_description(db, board_id):
+    source = io.BytesIO(b'{"title": "null description", "description": null}\n')
+    report = importer.import_tasks(db, board_id, source, "ndjson")
+    assert report["imported"] == 1 and report["rejected_count"] == 0
+    return db.scalar(
+        select(models.Task.description)
+        .where(models.Task.board_id == board_id, models.Task.title == "null description")
+    )
+
+
+def test_import_null_description_gets_the_default(db, seeded):
+    board_id = list(seeded.values())[1][0]
+    assert _import_null_description(db, board_id) == importer.DEFAULT_DESCRIPTION
+
+
+@requires_postgres
+def test_import_null_description_through_copy(db, seeded):
+    board_id = list(seeded.values())[1][1]
+    assert _import_null_description(db, board_id) == importer.DEFAULT_DESCRIPTION
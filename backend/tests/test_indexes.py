@@ -0,0 +1,80 @@
+"""The listings use the composite indexes (EXPLAIN on the seeded Postgres database)."""
+import pytest
+from sqlalchemy import event, select
+
+from app import crud, models
+from app.enums import TaskPriority, TaskStatus
+from conftest import requires_postgres
+
+pytestmark = requires_postgres
+
+
+@pytest.fixture(scope="module")
+def owner(seeded):
+    from app.database import Sessionlocal, engine
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("ANALYZE")
+        connection.commit()
+    email, board_ids = next(iter(seeded.items()))
+    with Sessionlocal() as session:
+        return session.scalar(select(models.User.id).where(models.User.email == email)), board_ids[0]
+
+
+def _index_names(plan):
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", ()):
+        names |= _index_names(child)
+    return names
+
+
+def indexes_used(db, table: str, call):
+    """Indexes in the plans of the statements on `table` that `call(db)` runs."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if f"FROM {table}" in statement:
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements, f"nothing read from {table}"
+
+    names = set()
+    connection = db.connection()
+    # the seeded tables are small enough that a sequential scan would win
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        names |= _index_names(plan[0]["Plan"])
+    db.rollback()
+    return names
+
+
+def test_board_listing_uses_owner_created_at_index(db, owner):
+    user_id, _ = owner
+    assert "ix_boards_owner_id_created_at" in indexes_used(db, "boards", lambda db: crud.list_boards(db, user_id))
+
+
+def test_task_listing_uses_board_created_at_index(db, owner):
+    user_id, board_id = owner
+    used = indexes_used(db, "tasks", lambda db: crud.page_tasks(db, board_id, user_id, limit=20))
+    assert "ix_tasks_board_id_created_at" in used
+
+
+def test_overdue_filter_uses_open_due_date_index(db, owner):
+    user_id, board_id = owner
+    used = indexes_used(db, "tasks", lambda db: crud.list_tasks(
+        db, board_id, user_id, filters={"overdue": True}, sort="due_date"))
+    assert "ix_tasks_board_id_open_due_date" in used
+
+
+def test_status_priority_filter_uses_a_board_index(db, owner):
+    user_id, board_id = owner
+    filters = {"status": [TaskStatus.todo], "priority": [TaskPriority.high]}
+    used = indexes_used(db, "tasks", lambda db: crud.list_tasks(db, board_id, user_id, filters=filters))
+    assert any(name.startswith("ix_tasks_board_id_") for name in used), used
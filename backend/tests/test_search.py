@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from app import search
+
+
+def test_highlight_escapes_the_text():
+    marked = search.highlight('<img src=x onerror="alert(1)"> fix <b>bug</b>', ["bug", "img"])
+    assert marked == '&lt;<b>img</b> src=x onerror=&quot;alert(1)&quot;&gt; fix &lt;b&gt;<b>bug</b>&lt;/b&gt;'
+
+
+def test_index_built_across_an_invalidation_is_not_cached():
+    backend = search.MemorySearch()
+    builds = []
+
+    def rows():
+        builds.append(1)
+        if len(builds) == 1:
+            # a write lands while the first index is being built
+            backend.invalidate_board(7)
+        return [SimpleNamespace(id=1, title="old", description="title")]
+
+    cached = lambda: backend._cached_index(backend._board_tasks, backend._board_builds, 7, rows)
+    cached()
+    assert backend._board_tasks.get(7) is None
+    index = cached()
+    assert backend._board_tasks.get(7) is index and cached() is index
+    assert len(builds) == 2
+
+
+def test_no_generations_are_kept_outside_builds():
+    backend = search.MemorySearch()
+    for board_id in range(100):
+        backend.invalidate_board(board_id)
+        backend.invalidate_owner(board_id)
+    backend._cached_index(backend._board_tasks, backend._board_builds, 1, lambda: [])
+    assert backend._board_builds == {} and backend._owner_builds == {}
@@ -0,0 +1,39 @@
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from app import crud, models, stats
+
+
+def _new_user(db, name):
+    return crud.create_user(db, {"name": name, "email": f"{name}@example.com", "password": "x"}).id
+
+
+def test_overdue_counts_tasks_that_passed_their_due_date(db):
+    user_id = _new_user(db, "overdue")
+    board_id = crud.create_board(db, user_id, {"title": "b", "description": "d"}).id
+    soon = datetime.now() + timedelta(seconds=1)
+    task = crud.create_task(db, board_id, user_id, {"title": "t", "description": "d", "due_date": soon})
+    assert stats.user_stats(db, user_id)["overdue"] == 0
+
+    # no write in between: only the clock made it overdue
+    time.sleep(1.1)
+    assert stats.user_stats(db, user_id)["overdue"] == 1
+
+    crud.update_task(db, board_id, task.id, user_id, {"status": "Done"})
+    result = stats.user_stats(db, user_id)
+    assert result["overdue"] == 0
+    assert result["completed"] == result["total"] == 1
+
+
+def test_user_stats_without_a_row_does_not_write(db):
+    user_id = _new_user(db, "norow")
+    board_id = crud.create_board(db, user_id, {"title": "b", "description": "d"}).id
+    crud.create_task(db, board_id, user_id, {"title": "t", "description": "d", "priority": "High"})
+    db.execute(delete(models.UserStats).where(models.UserStats.user_id == user_id))
+    db.commit()
+
+    result = stats.user_stats(db, user_id)
+    assert result["total"] == 1 and result["by_priority"]["High"] == 1
+    assert db.get(models.UserStats, user_id) is None
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app import crud, models, tombstones
+
+
+def _sync(db, user_id, token, limit=1000):
+    seq, _, origin = str(token).partition(".")
+    return crud.changes_since(db, user_id, int(seq), limit=limit, origin=int(origin) if origin else None)
+
+
+def _sync_all(db, user_id, token, limit):
+    """Follow `next` until has_more is false; the responses in order."""
+    pages = [_sync(db, user_id, token, limit)]
+    while pages[-1]["has_more"] and not pages[-1].get("reset"):
+        pages.append(_sync(db, user_id, pages[-1]["next"], limit))
+    return pages
+
+
+def test_tokens_older_than_purged_tombstones_get_a_reset(db):
+    user_id = crud.create_user(db, {"name": "sync", "email": "sync@example.com", "password": "x"}).id
+    board_id = crud.create_board(db, user_id, {"title": "b", "description": "d"}).id
+    task_ids = [crud.create_task(db, board_id, user_id, {"title": f"t{i}", "description": "d"}).id for i in range(6)]
+    stale = crud.changes_since(db, user_id, 0)["next"]
+    crud.delete_task(db, board_id, task_ids[0], user_id)
+    recent = crud.changes_since(db, user_id, 0)["next"]
+
+    db.execute(update(models.Tombstone).where(models.Tombstone.owner_id == user_id)
+               .values(deleted_at=datetime.now(timezone.utc) - timedelta(days=60)))
+    assert tombstones.purge_chunk(db, datetime.now(timezone.utc) - timedelta(days=30), 100) == 1
+    db.commit()
+
+    assert _sync(db, user_id, stale)["reset"]
+    assert not _sync(db, user_id, recent).get("reset")
+
+    # a full sync pages through sequences below the purged ones without a reset
+    pages = _sync_all(db, user_id, 0, limit=2)
+    assert len(pages) > 1 and not any(page.get("reset") for page in pages)
+    assert sorted(task.id for page in pages for task in page["tasks"]) == task_ids[1:]
@@ -0,0 +1,85 @@
+import asyncio
+import itertools
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app import crud
+from app.enums import TaskPriority, TaskStatus
+from app.routers import tasks as tasks_router
+from app.schemas.task import TaskUpdate
+from app.schemas.user import Principal
+
+_users = itertools.count()
+
+
+@pytest.fixture
+def board(db):
+    """(user id, board id, {title: task}) of a fresh board with four tasks."""
+    user_id = crud.create_user(db, {"name": "tasks", "email": f"tasks{next(_users)}@example.com", "password": "x"}).id
+    board_id = crud.create_board(db, user_id, {"title": "b", "description": "d"}).id
+    created = {}
+    for title, status, priority, due in [
+        ("a", TaskStatus.todo, TaskPriority.low, datetime(2030, 1, 3)),
+        ("b", TaskStatus.in_progress, TaskPriority.high, None),
+        ("c", TaskStatus.done, TaskPriority.medium, datetime(2030, 1, 1)),
+        ("d", TaskStatus.todo, TaskPriority.high, datetime(2030, 1, 2)),
+    ]:
+        created[title] = crud.create_task(db, board_id, user_id, {
+            "title": title, "description": "d", "status": status, "priority": priority, "due_date": due,
+        })
+    return user_id, board_id, created
+
+
+def _titles(db, board, **kwargs):
+    user_id, board_id, _ = board
+    return [task.title for task in crud.list_tasks(db, board_id, user_id, **kwargs)]
+
+
+def _filters(status=None, priority=None):
+    return tasks_router.task_filters(status_filter=status, priority=priority)
+
+
+def test_status_and_priority_filters_take_several_values(db, board):
+    # comma-separated and repeated parameters, labels or aliases
+    assert sorted(_titles(db, board, filters=_filters(status=["To Do,doing"]))) == ["a", "b", "d"]
+    assert sorted(_titles(db, board, filters=_filters(status=["todo", "closed"]))) == ["a", "c", "d"]
+    assert sorted(_titles(db, board, filters=_filters(status=["to do"], priority=["High", "low"]))) == ["a", "d"]
+
+
+def test_unknown_filter_value_is_a_400():
+    with pytest.raises(HTTPException) as exc:
+        _filters(priority=["High,urgent"])
+    assert exc.value.status_code == 400 and exc.value.detail.startswith("Invalid priority")
+
+
+def test_sort_orders_by_each_field_in_turn(db, board):
+    assert _titles(db, board, sort="priority,-due_date") == ["d", "b", "c", "a"]
+    # due dates first, tasks without one last either way
+    assert _titles(db, board, sort="due_date") == ["c", "d", "a", "b"]
+    assert _titles(db, board, sort="-due_date") == ["a", "d", "c", "b"]
+    assert _titles(db, board, sort=" status , title") == ["a", "d", "b", "c"]
+
+
+def test_unknown_sort_field_is_a_400(db, board):
+    with pytest.raises(HTTPException) as exc:
+        _titles(db, board, sort="priority,owner")
+    assert exc.value.status_code == 400 and "'owner'" in exc.value.detail
+
+
+def test_update_ignores_nulls_except_due_date(db, board):
+    user_id, board_id, created = board
+    task_id = created["a"].id
+
+    def update(**values):
+        return asyncio.run(tasks_router.update_task(
+            board_id, task_id, TaskUpdate(**values), db=db, current_user=Principal(id=user_id)
+        ))
+
+    task = update(title=None, description=None, status="", priority=None, due_date=datetime(2031, 1, 1))
+    assert (task.title, task.description, task.status, task.priority) == ("a", "d", TaskStatus.todo, TaskPriority.low)
+    assert task.due_date == datetime(2031, 1, 1)
+    # null clears the due date; fields left out stay as they are
+    task = update(due_date=None, status="done")
+    assert task.due_date is None and task.status is TaskStatus.done and task.title == "a"
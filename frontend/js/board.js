@@ -179,7 +179,8 @@ async function fetchUser() {
 // Fetch boards
 async function fetchBoards() {
   try {
-    const response = await fetch(`${API_BASE}/boards`, {
+    // Boards with server-side task counts; GET /boards no longer embeds tasks
+    const response = await fetch(`${API_BASE}/boards/summary`, {
       headers: { Authorization: `Bearer ${token}` },
     });
 
@@ -194,7 +195,9 @@ async function fetchBoards() {
     // Add task count to each board (if not provided by backend)
     boardsData = boardsData.map((board) => ({
       ...board,
-      taskCount: Array.isArray(board.tasks)
+      taskCount: board.stats
+        ? board.stats.total
+        : Array.isArray(board.tasks)
         ? board.tasks.length
         : board.taskCount || 0,
     }));
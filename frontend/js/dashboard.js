@@ -155,9 +155,13 @@ async function fetchBoards() {
   try {
     showBoardsLoading();
 
-    const res = await fetch("https://taskmanager-tj4l.onrender.com/boards", {
-      headers: { Authorization: `Bearer ${token}` },
-    });
+    // One request: boards plus server-side task counts (no per-board fan-out)
+    const res = await fetch(
+      "https://taskmanager-tj4l.onrender.com/boards/summary",
+      {
+        headers: { Authorization: `Bearer ${token}` },
+      }
+    );
 
     if (!res.ok) {
       throw new Error(`HTTP error! status: ${res.status}`);
@@ -171,32 +175,9 @@ async function fetchBoards() {
       return;
     }
 
-    // Fetch task counts for each board
-    await Promise.all(
-      allBoards.map(async (board) => {
-        try {
-          const tasksRes = await fetch(
-            `https://taskmanager-tj4l.onrender.com/boards/${board.id}/tasks`,
-            {
-              headers: { Authorization: `Bearer ${token}` },
-            }
-          );
-
-          if (tasksRes.ok) {
-            const tasks = await tasksRes.json();
-            board.taskCount = tasks.length || 0;
-            board.tasks = tasks;
-          } else {
-            board.taskCount = 0;
-            board.tasks = [];
-          }
-        } catch (err) {
-          console.error(`Error fetching tasks for board ${board.id}:`, err);
-          board.taskCount = 0;
-          board.tasks = [];
-        }
-      })
-    );
+    allBoards.forEach((board) => {
+      board.taskCount = board.stats?.total || 0;
+    });
 
     renderBoards();
     updateStats();
@@ -497,16 +478,10 @@ function updateStats() {
   let completed = 0;
 
   allBoards.forEach((board) => {
-    if (board.tasks) {
-      taskCount += board.tasks.length;
-      board.tasks.forEach((task) => {
-        const status = (task.status || "").toLowerCase();
-        if (status === "completed" || status === "done") {
-          completed++;
-        } else {
-          pending++;
-        }
-      });
+    if (board.stats) {
+      taskCount += board.stats.total;
+      completed += board.stats.completed;
+      pending += board.stats.total - board.stats.completed;
     }
   });
 
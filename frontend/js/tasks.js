@@ -66,6 +66,7 @@ let selectedTasks = new Set();
 let currentView = "table";
 let currentBoardId = null;
 let currentBoardName = "";
+let boardEvents = null;
 
 // API Base URL
 const API_BASE = "https://taskmanager-tj4l.onrender.com";
@@ -109,6 +110,7 @@ async function initializeApp() {
 
     console.log("Fetching tasks for board:", currentBoardId);
     await fetchTasks();
+    subscribeToBoardEvents();
 
     setupEventListeners();
     hideLoading();
@@ -279,6 +281,7 @@ function closeSidebar() {
 
 // Logout
 function logout() {
+  if (boardEvents) boardEvents.close();
   localStorage.removeItem("token");
   window.location.href = "index.html";
 }
@@ -353,7 +356,12 @@ async function fetchBoardInfo() {
 // Fetch tasks for the current board
 async function fetchTasks() {
   try {
-    const url = `${API_BASE}/boards/${currentBoardId}/tasks`;
+    // status/priority are filtered by the server; the search box stays local
+    const params = new URLSearchParams();
+    if (statusFilter?.value) params.set("status", statusFilter.value);
+    if (priorityFilter?.value) params.set("priority", priorityFilter.value);
+    const query = params.toString();
+    const url = `${API_BASE}/boards/${currentBoardId}/tasks${query ? `?${query}` : ""}`;
     console.log("Fetching from URL:", url);
 
     const response = await fetch(url, {
@@ -378,8 +386,7 @@ async function fetchTasks() {
     allTasks = Array.isArray(tasks) ? tasks : [];
     console.log("Processed tasks:", allTasks);
 
-    filteredTasks = [...allTasks];
-    renderTasks();
+    applyFilters();
   } catch (error) {
     console.error("Error fetching tasks:", error);
     showError("Unable to fetch tasks: " + error.message);
@@ -389,6 +396,88 @@ async function fetchTasks() {
   }
 }
 
+// Keep allTasks current from the board's change feed instead of refetching
+async function subscribeToBoardEvents() {
+  if (!window.EventSource) return;
+
+  // EventSource cannot send headers, and the URL ends up in logs: open it with
+  // a short-lived token for this board rather than the login token
+  let streamToken;
+  try {
+    const response = await fetch(`${API_BASE}/boards/${currentBoardId}/events/token`, {
+      method: "POST",
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}: Failed to open the change feed`);
+    }
+    streamToken = (await response.json()).token;
+  } catch (error) {
+    console.error("Error subscribing to board events:", error);
+    return;
+  }
+
+  // reconnects resume with Last-Event-ID by themselves while the token is
+  // valid; once it has expired the feed closes, so catch up and reopen it
+  boardEvents = new EventSource(
+    `${API_BASE}/boards/${currentBoardId}/events?token=${encodeURIComponent(streamToken)}`
+  );
+  boardEvents.addEventListener("error", () => {
+    if (boardEvents.readyState !== EventSource.CLOSED) return;
+    setTimeout(async () => {
+      await fetchTasks();
+      subscribeToBoardEvents();
+    }, 3000);
+  });
+
+  const upsertTasks = (e) => {
+    const { tasks } = JSON.parse(e.data);
+    tasks.forEach((task) => {
+      const index = allTasks.findIndex((t) => t.id === task.id);
+      if (index >= 0) {
+        allTasks[index] = task;
+      } else {
+        allTasks.unshift(task);
+      }
+    });
+    applyFilters();
+  };
+
+  boardEvents.addEventListener("task.created", upsertTasks);
+  boardEvents.addEventListener("task.updated", upsertTasks);
+  boardEvents.addEventListener("task.deleted", (e) => {
+    const ids = new Set(JSON.parse(e.data).ids);
+    allTasks = allTasks.filter((t) => !ids.has(t.id));
+    applyFilters();
+  });
+  // large imports/batches and missed events: reload the list once
+  boardEvents.addEventListener("board.changed", () => fetchTasks());
+  boardEvents.addEventListener("reset", () => fetchTasks());
+  // due-date reminders change no data: just tell the user
+  boardEvents.addEventListener("task.due", (e) => {
+    const { ids } = JSON.parse(e.data);
+    showSuccess(ids.length === 1 ? "A task is now due" : `${ids.length} tasks are now due`);
+  });
+  boardEvents.addEventListener("board.updated", (e) => {
+    const { board } = JSON.parse(e.data);
+    currentBoardName = board.title;
+    if (boardTitle) {
+      boardTitle.textContent = `${currentBoardName} - Tasks`;
+    }
+  });
+  boardEvents.addEventListener("board.deleted", () => {
+    boardEvents.close();
+    alert("This board was deleted.");
+    window.location.href = "board.html";
+  });
+}
+
+// After a write: the change feed delivers it, refetch only without one
+async function refreshTasks() {
+  if (boardEvents && boardEvents.readyState === EventSource.OPEN) return;
+  await fetchTasks();
+}
+
 // Format date for display
 function formatDate(dateString) {
   if (!dateString) return "";
@@ -620,7 +709,7 @@ function handleSearch() {
 }
 
 function handleFilterChange() {
-  applyFilters();
+  fetchTasks();
 }
 
 // Apply filters - removed board filtering
@@ -743,7 +832,7 @@ async function handleTaskSubmit(e) {
     }
 
     closeTaskModal();
-    await fetchTasks();
+    await refreshTasks();
     hideLoading();
   } catch (error) {
     console.error("Error saving task:", error);
@@ -831,7 +920,7 @@ async function handleDeleteTask(id) {
     }
 
     showSuccess("Task deleted successfully");
-    await fetchTasks();
+    await refreshTasks();
     hideLoading();
   } catch (error) {
     console.error("Error deleting task:", error);
@@ -951,7 +1040,7 @@ async function handleBulkStatusSubmit(e) {
     showSuccess(`Updated ${selectedTasks.size} tasks`);
     closeBulkStatusModal();
     clearTaskSelection();
-    await fetchTasks();
+    await refreshTasks();
     hideLoading();
   } catch (error) {
     console.error("Error updating tasks:", error);
@@ -995,7 +1084,7 @@ async function handleBulkDelete() {
 
     showSuccess(`Deleted ${selectedTasks.size} tasks`);
     clearTaskSelection();
-    await fetchTasks();
+    await refreshTasks();
     hideLoading();
   } catch (error) {
     console.error("Error deleting tasks:", error);